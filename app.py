@@ -1,12 +1,21 @@
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, Response, jsonify, request, send_file
 from flask_cors import CORS
 from sqlalchemy import inspect, text
 from config import DevelopmentConfig
 from models.models import db
-from services.database_service import DatabaseService
+from services.database_service import DatabaseService, InstrumentedQueuePool
+from services.cache_service import ScoreCacheService
+from services.job_service import JobService
+from services.match_service import MatchScoreService
+from services.services import AIClientRegistry, creer_caller
+from services.skill_index_service import SkillIndexService
+from services.metrics_service import MetricsRegistry
+from services.profiling_service import ProfilingService
 from routes.candidate_routes import candidate_bp
 from routes.offer_routes import offer_bp
 from routes.application_routes import application_bp
+from routes.job_routes import job_bp
+from routes.profiling_routes import profiling_bp
 
 def create_app(config_class=DevelopmentConfig):
     """Factory pour créer l'application Flask"""
@@ -16,11 +25,52 @@ def create_app(config_class=DevelopmentConfig):
     app.config.from_object(config_class)
     
     # Configuration CORS
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor', 'Link'])
     
-    # Initialisation de la base de données
+    # Initialisation de la base de données (pool instrumenté pour les métriques d'attente)
+    engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if 'pool_size' in engine_options:
+        engine_options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
     db.init_app(app)
     
+    # Registre des clients Gemini (un client par modèle, réutilisé entre requêtes, appels protégés)
+    app.extensions['ai_registry'] = AIClientRegistry(creer_caller(app.config))
+    if app.config['AI_WARMUP']:
+        app.extensions['ai_registry'].warm_up(app.config['GEMINI_MODEL'], app.config['GEMINI_API_KEY'])
+    
+    # Cache des scores IA (LRU en mémoire + table persistante)
+    app.extensions['score_cache'] = ScoreCacheService(
+        ttl=app.config['SCORE_CACHE_TTL'],
+        max_entries=app.config['SCORE_CACHE_MAX_ENTRIES']
+    )
+    
+    # File de tâches d'analyse IA en arrière-plan
+    app.extensions['jobs'] = JobService(app, max_workers=app.config['JOB_WORKERS'])
+    
+    # Matrice des scores offre/candidat, rafraîchie en arrière-plan à chaque création
+    app.extensions['match_scores'] = MatchScoreService(app, max_workers=app.config['MATCH_WORKERS'])
+    
+    # Métriques (requêtes HTTP, SQL, IA, caches, pool)
+    metrics = MetricsRegistry()
+    metrics.init_app(app)
+    metrics.register_callback('smartrecruit_score_cache_total', 'Accès au cache de scores IA', 'counter',
+                              'resultat', lambda: app.extensions['score_cache'].stats)
+    metrics.register_callback('smartrecruit_ai_clients_total', 'Clients Gemini créés / réutilisés', 'counter',
+                              'etat', lambda: app.extensions['ai_registry'].stats)
+    metrics.register_callback('smartrecruit_ai_resilience_total', 'Appels Gemini : tentatives, réessais, refus',
+                              'counter', 'evenement', lambda: app.extensions['ai_registry'].caller.etat())
+    metrics.register_callback('smartrecruit_db_pool', 'État du pool de connexions', 'gauge',
+                              'mesure', lambda: DatabaseService().pool_metrics())
+    metrics.register_callback('smartrecruit_match_scores_total', 'Rafraîchissements de la matrice des scores',
+                              'counter', 'evenement', lambda: app.extensions['match_scores'].stats)
+    with app.app_context():
+        metrics.instrument_engine(db.engine)
+    
+    # Profilage à la demande (PROFILING_MODE : off, header ou always)
+    profiling = ProfilingService(app)
+    profiling.init_app(app)
+    
     # Création des tables au démarrage
     with app.app_context():
         try:
@@ -40,6 +90,27 @@ def create_app(config_class=DevelopmentConfig):
     app.register_blueprint(candidate_bp, url_prefix='/api')
     app.register_blueprint(offer_bp, url_prefix='/api')
     app.register_blueprint(application_bp, url_prefix='/api')
+    app.register_blueprint(job_bp, url_prefix='/api')
+    if profiling.mode != 'off':
+        app.register_blueprint(profiling_bp, url_prefix='/profiling')
+    
+    # Commandes CLI
+    @app.cli.command('index-competences')
+    def index_competences():
+        """Reconstruit l'index des compétences (candidats et offres existants)"""
+        stats = SkillIndexService().reindexer_tout()
+        print(f"Index reconstruit : {stats['offres']} offres, {stats['candidats']} candidats")
+    
+    @app.cli.command('rebuild-match-scores')
+    def rebuild_match_scores():
+        """Recalcule la matrice des scores offre/candidat (données existantes)"""
+        total = app.extensions['match_scores'].reconstruire()
+        print(f"Matrice reconstruite : {total} paires")
+    
+    @app.cli.command('profile-token')
+    def profile_token():
+        """Affiche un jeton pour l'en-tête X-Profile-Token (PROFILING_MODE=header)"""
+        print(profiling.creer_jeton())
     
     # Route de santé
     @app.route('/health', methods=['GET'])
@@ -48,9 +119,21 @@ def create_app(config_class=DevelopmentConfig):
         return jsonify({
             "status": "healthy",
             "service": "Smart-Recruit API",
-            "version": "1.0.0"
+            "version": "1.0.0",
+            "ai_clients": app.extensions['ai_registry'].stats,
+            "ai_resilience": app.extensions['ai_registry'].caller.etat()
         })
     
+    @app.route('/health/db', methods=['GET'])
+    def health_db():
+        """État du pool de connexions à la base de données"""
+        return jsonify(DatabaseService().pool_metrics())
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Métriques au format texte Prometheus"""
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+    
     @app.route('/api/test', methods=['GET'])
     def api_test():
         return jsonify({
@@ -79,7 +162,7 @@ def create_app(config_class=DevelopmentConfig):
     def after_request(response):
         """Logging des requêtes"""
         app.logger.info(
-            f"{request.remote_addr} {request.method} {request.path} {response.status_code}"
+            "%s %s %s %s", request.remote_addr, request.method, request.path, response.status_code
         )
         return response
     
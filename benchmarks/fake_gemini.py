@@ -0,0 +1,56 @@
+"""Faux backend Gemini pour les benchmarks : latence et taux d'erreur configurables"""
+import json
+import random
+import re
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+class FakeUsage:
+    def __init__(self, prompt, text):
+        # Estimation grossière : ~4 caractères par token
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+
+class FakeResponse:
+    def __init__(self, prompt, text):
+        self.text = text
+        self.prompt_feedback = None
+        self.usage_metadata = FakeUsage(prompt, text)
+
+class FakeGenerativeModel:
+    """Remplace genai.GenerativeModel : réponse JSON déterministe après une latence simulée"""
+    
+    latency = 0.0
+    error_rate = 0.0
+    calls = 0
+    
+    def __init__(self, model_name, *args, **kwargs):
+        self.model_name = model_name
+        self._random = random.Random(42)
+    
+    def generate_content(self, prompt, **kwargs):
+        type(self).calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise RuntimeError("Erreur simulée du backend Gemini")
+        
+        ids = [int(i) for i in re.findall(r'candidat_id (\d+)', prompt)]
+        if ids:
+            text = json.dumps([
+                {"candidat_id": i, "score": (i * 37) % 101, "justification": "Réponse simulée"} for i in ids
+            ])
+        else:
+            text = json.dumps({"score": len(prompt) % 101, "justification": "Réponse simulée"})
+        return FakeResponse(prompt, text)
+
+@contextmanager
+def fake_gemini(latency: float = 0.0, error_rate: float = 0.0):
+    """Installe le faux modèle le temps du bloc (aucun appel réseau)"""
+    FakeGenerativeModel.latency = latency
+    FakeGenerativeModel.error_rate = error_rate
+    FakeGenerativeModel.calls = 0
+    with patch('google.generativeai.configure'), \
+         patch('google.generativeai.GenerativeModel', FakeGenerativeModel):
+        yield FakeGenerativeModel
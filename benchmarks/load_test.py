@@ -0,0 +1,82 @@
+"""
+Test de charge simple : N clients concurrents sur un endpoint d'une API démarrée
+
+Exemple (API lancée avec gunicorn -w 4 'app:create_app()') :
+    python -m benchmarks.load_test --url http://127.0.0.1:5000/api/candidates --concurrency 64 --duration 30
+
+Affiche le débit, les latences p50/p95/p99 et l'état du pool (/health/db) avant et après.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+def fetch_json(url):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return json.loads(response.read())
+    except Exception as e:
+        return {"error": str(e)}
+
+def run(url, concurrency, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    
+    def worker():
+        local = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+            except Exception:
+                local_errors += 1
+                continue
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+    
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    return {
+        "requetes": len(latencies),
+        "erreurs": errors[0],
+        "req_s": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge Smart-Recruit")
+    parser.add_argument('--url', default='http://127.0.0.1:5000/api/candidates')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+    
+    parts = urlsplit(args.url)
+    health_url = f"{parts.scheme}://{parts.netloc}/health/db"
+    
+    print("Pool avant :", json.dumps(fetch_json(health_url), ensure_ascii=False))
+    print("Résultats  :", json.dumps(run(args.url, args.concurrency, args.duration), ensure_ascii=False))
+    print("Pool après :", json.dumps(fetch_json(health_url), ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
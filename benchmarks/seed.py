@@ -0,0 +1,65 @@
+"""Génération de jeux de données synthétiques (10^3 à 10^6 lignes) par insertions groupées"""
+import random
+from sqlalchemy import insert
+from models.models import db, Candidat, OffreEmploi, Candidature
+from services.skill_index_service import SkillIndexService
+
+COMPETENCES = [
+    "Python", "Flask", "Django", "PostgreSQL", "SQL", "Docker", "Kubernetes", "JavaScript",
+    "React", "Java", "Spring", "Machine Learning", "Pandas", "AWS", "Linux", "Git", "Go", "Rust",
+]
+DIPLOMES = ["Licence", "Master", "Doctorat", "BTS", "Ingénieur"]
+
+TAILLE_LOT = 5000
+
+def seed(candidats: int, offres: int, candidatures: int, seed: int = 42, indexer: bool = False) -> dict:
+    """
+    Remplit la base courante (tables vidées au préalable)
+    
+    Args:
+        candidats, offres, candidatures: nombre de lignes de chaque table
+        indexer: reconstruire aussi l'index des compétences (plus lent)
+    """
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+    
+    for debut in range(0, candidats, TAILLE_LOT):
+        db.session.execute(insert(Candidat), [
+            {
+                "nom": f"Candidat {i}",
+                "email": f"candidat{i}@exemple.com",
+                "bio": "Développeur avec expérience en " + ", ".join(rng.sample(COMPETENCES, 4)),
+                "diplome": rng.choice(DIPLOMES),
+            }
+            for i in range(debut, min(debut + TAILLE_LOT, candidats))
+        ])
+    
+    for debut in range(0, offres, TAILLE_LOT):
+        db.session.execute(insert(OffreEmploi), [
+            {
+                "titre": f"Offre {i}",
+                "description": f"Poste de développeur numéro {i} au sein d'une équipe produit",
+                "competences_cles": rng.sample(COMPETENCES, 3),
+                "salaire": float(rng.randrange(30000, 90000, 1000)),
+            }
+            for i in range(debut, min(debut + TAILLE_LOT, offres))
+        ])
+    
+    # Paires (candidat, offre) uniques ; la moitié concentrée sur les 50 premières offres
+    paires = set()
+    cible = min(candidatures, candidats * offres)
+    while len(paires) < cible:
+        offre_max = min(offres, 50) if rng.random() < 0.5 else offres
+        paires.add((rng.randint(1, candidats), rng.randint(1, offre_max)))
+    paires = sorted(paires)
+    for debut in range(0, len(paires), TAILLE_LOT):
+        db.session.execute(insert(Candidature), [
+            {"candidat_id": c, "offre_id": o} for c, o in paires[debut:debut + TAILLE_LOT]
+        ])
+    db.session.commit()
+    
+    if indexer:
+        SkillIndexService().reindexer_tout()
+    
+    return {"candidats": candidats, "offres": offres, "candidatures": len(paires)}
@@ -0,0 +1,221 @@
+"""
+Suite de benchmarks reproductible des chemins critiques de l'API (backend Gemini simulé)
+
+Exemples :
+    python -m benchmarks.suite --scale 10000 --output benchmarks/baseline.json
+    python -m benchmarks.suite --scale 10000 --compare benchmarks/baseline.json --tolerance 0.2
+
+La base est remplie avec des données synthétiques (--scale candidats, --scale/10 offres,
+2 x --scale candidatures), puis chaque scénario est exécuté via le client de test Flask
+et/ou un vrai serveur WSGI (werkzeug, multi-thread). Les résultats (req/s, p50/p95/p99,
+mémoire) sont écrits en JSON ; --compare sort en erreur (code 1) en cas de régression.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+from werkzeug.serving import make_server
+from app import create_app
+from benchmarks.fake_gemini import fake_gemini
+from benchmarks.load_test import percentile
+from benchmarks.seed import seed
+from config import TestingConfig, engine_options
+from models.models import db
+
+class BenchmarkConfig(TestingConfig):
+    """Configuration des benchmarks : base dédiée, clé Gemini factice (le modèle est simulé)"""
+    TESTING = False
+    SQLALCHEMY_DATABASE_URI = os.getenv('BENCH_DATABASE_URL', 'sqlite:///benchmark.db')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=10, max_overflow=20)
+    GEMINI_API_KEY = 'benchmark'
+
+# (nom, méthode, chemin, corps JSON, part des requêtes) ; {i} est remplacé par un compteur
+SCENARIOS = [
+    ("candidates_list", "GET", "/api/candidates?limit=100", None, 1),
+    ("offers_list", "GET", "/api/offers?limit=100", None, 1),
+    ("applications_list", "GET", "/api/applications?limit=100", None, 1),
+    ("offer_candidates", "GET", "/api/offers/1/candidates", None, 1),
+    ("matching_candidates", "GET", "/api/offers/1/matching-candidates?limit=50", None, 1),
+    ("analyze_match", "POST", "/api/offers/1/analyze-match", {"candidat_id": "{i}"}, 1),
+    ("rank", "POST", "/api/offers/{i}/rank", None, 0.1),
+]
+
+def _corps(corps, i):
+    if corps is None:
+        return None
+    return {k: (i if v == "{i}" else v) for k, v in corps.items()}
+
+def _resume(latences, duree, erreurs):
+    return {
+        "requetes": len(latences),
+        "erreurs": erreurs,
+        "req_s": round(len(latences) / duree, 1) if duree else 0.0,
+        "p50_ms": round(percentile(latences, 50), 2),
+        "p95_ms": round(percentile(latences, 95), 2),
+        "p99_ms": round(percentile(latences, 99), 2),
+    }
+
+def run_client(app, requetes, modulo):
+    """Exécute chaque scénario séquentiellement via le client de test (sans réseau)"""
+    client = app.test_client()
+    resultats = {}
+    for nom, methode, chemin, corps, part in SCENARIOS:
+        n = max(1, int(requetes * part))
+        appeler = lambda i: client.open(chemin.format(i=i % modulo + 1), method=methode,
+                                        json=_corps(corps, i % modulo + 1))
+        appeler(0)  # échauffement (caches, plans de requête)
+
+        latences, erreurs = [], 0
+        debut = time.perf_counter()
+        for i in range(n):
+            start = time.perf_counter()
+            response = appeler(i)
+            latences.append((time.perf_counter() - start) * 1000)
+            erreurs += response.status_code >= 400
+        resultats[nom] = _resume(latences, time.perf_counter() - debut, erreurs)
+
+        # Pic d'allocation Python d'une requête, mesuré à part pour ne pas fausser les latences
+        tracemalloc.start()
+        appeler(n)
+        resultats[nom]["pic_memoire_ko"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return resultats
+
+def run_wsgi(app, requetes, modulo, concurrency):
+    """Exécute chaque scénario contre un serveur WSGI réel, avec N clients concurrents"""
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def appeler(methode, chemin, corps, i):
+        data = json.dumps(_corps(corps, i)).encode() if corps is not None else None
+        req = urllib.request.Request(base + chemin.format(i=i), data=data, method=methode,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                response.read()
+            return True
+        except Exception:
+            return False
+
+    resultats = {}
+    try:
+        for nom, methode, chemin, corps, part in SCENARIOS:
+            n = max(1, int(requetes * part))
+            appeler(methode, chemin, corps, 1)
+            latences, erreurs = [], [0]
+            lock = threading.Lock()
+            compteur = iter(range(n))
+
+            def worker():
+                local, local_erreurs = [], 0
+                while True:
+                    with lock:
+                        i = next(compteur, None)
+                    if i is None:
+                        break
+                    start = time.perf_counter()
+                    ok = appeler(methode, chemin, corps, i % modulo + 1)
+                    local.append((time.perf_counter() - start) * 1000)
+                    local_erreurs += not ok
+                with lock:
+                    latences.extend(local)
+                    erreurs[0] += local_erreurs
+
+            debut = time.perf_counter()
+            threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            resultats[nom] = _resume(latences, time.perf_counter() - debut, erreurs[0])
+    finally:
+        server.shutdown()
+    return resultats
+
+def comparer(actuel, reference, tolerance):
+    """
+    Compare deux rapports ; retourne la liste des régressions
+
+    Une régression est un p95 supérieur de plus de `tolerance` (fraction) à la référence,
+    ou un débit inférieur de plus de `tolerance`.
+    """
+    regressions = []
+    for mode, scenarios in reference.get("resultats", {}).items():
+        for nom, ref in scenarios.items():
+            cur = actuel.get("resultats", {}).get(mode, {}).get(nom)
+            if cur is None:
+                continue
+            if ref["p95_ms"] and cur["p95_ms"] > ref["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{mode}/{nom} : p95 {ref['p95_ms']} -> {cur['p95_ms']} ms")
+            if ref["req_s"] and cur["req_s"] < ref["req_s"] * (1 - tolerance):
+                regressions.append(f"{mode}/{nom} : débit {ref['req_s']} -> {cur['req_s']} req/s")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks Smart-Recruit (Gemini simulé)")
+    parser.add_argument('--scale', type=int, default=1000, help="Nombre de candidats (10^3 à 10^6)")
+    parser.add_argument('--requests', type=int, default=200, help="Requêtes par scénario")
+    parser.add_argument('--mode', choices=('client', 'wsgi', 'both'), default='both')
+    parser.add_argument('--concurrency', type=int, default=8, help="Clients concurrents (mode wsgi)")
+    parser.add_argument('--ai-latency', type=float, default=0.05, help="Latence simulée de Gemini (s)")
+    parser.add_argument('--ai-error-rate', type=float, default=0.0, help="Taux d'erreur simulé de Gemini")
+    parser.add_argument('--no-seed', action='store_true', help="Réutiliser la base existante")
+    parser.add_argument('--no-index', action='store_true', help="Ne pas construire l'index des compétences")
+    parser.add_argument('--output', help="Fichier JSON des résultats (nouvelle référence)")
+    parser.add_argument('--compare', help="Fichier JSON de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Écart toléré (fraction)")
+    args = parser.parse_args(argv)
+
+    app = create_app(BenchmarkConfig)
+    offres = max(1, args.scale // 10)
+    with app.app_context():
+        if not args.no_seed:
+            debut = time.perf_counter()
+            volumes = seed(args.scale, offres, args.scale * 2, indexer=not args.no_index)
+            print(f"Données : {volumes} en {time.perf_counter() - debut:.1f} s", file=sys.stderr)
+        db.session.remove()
+
+    rapport = {
+        "date": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "base": app.config['SQLALCHEMY_DATABASE_URI'].split('://', 1)[0],
+        "parametres": {k: getattr(args, k) for k in ('scale', 'requests', 'concurrency', 'ai_latency', 'ai_error_rate')},
+        "resultats": {},
+    }
+    with fake_gemini(latency=args.ai_latency, error_rate=args.ai_error_rate) as modele:
+        if args.mode in ('client', 'both'):
+            rapport["resultats"]["client"] = run_client(app, args.requests, offres)
+        if args.mode in ('wsgi', 'both'):
+            rapport["resultats"]["wsgi"] = run_wsgi(app, args.requests, offres, args.concurrency)
+        rapport["appels_ia"] = modele.calls
+    # ru_maxrss est en Ko sous Linux
+    rapport["rss_max_ko"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    app.extensions['jobs'].shutdown()
+
+    print(json.dumps(rapport, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            reference = json.load(f)
+        regressions = comparer(rapport, reference, args.tolerance)
+        for regression in regressions:
+            print("RÉGRESSION", regression, file=sys.stderr)
+        if regressions:
+            return 1
+        print("Aucune régression", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
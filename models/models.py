@@ -3,6 +3,31 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# Tables d'association de l'index inversé des compétences
+candidat_competences = db.Table(
+    'candidat_competences',
+    db.Column('candidat_id', db.Integer, db.ForeignKey('candidats.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('competence_id', db.Integer, db.ForeignKey('competences.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_candidat_competences_competence', 'competence_id', 'candidat_id')
+)
+
+offre_competences = db.Table(
+    'offre_competences',
+    db.Column('offre_id', db.Integer, db.ForeignKey('offres_emploi.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('competence_id', db.Integer, db.ForeignKey('competences.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_offre_competences_competence', 'competence_id', 'offre_id')
+)
+
+class Competence(db.Model):
+    """Dictionnaire normalisé des compétences (forme canonique)"""
+    __tablename__ = 'competences'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    nom = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<Competence {self.nom}>'
+
 class OffreEmploi(db.Model):
     """Modèle pour les offres d'emploi"""
     __tablename__ = 'offres_emploi'
@@ -57,4 +82,70 @@ class Candidature(db.Model):
     )
     
     def __repr__(self):
-        return f'<Candidature {self.candidat_id} -> {self.offre_id}>'
\ No newline at end of file
+        return f'<Candidature {self.candidat_id} -> {self.offre_id}>'
+
+class ScoreCompatibilite(db.Model):
+    """Cache persistant des scores de compatibilité calculés par l'IA"""
+    __tablename__ = 'scores_compatibilite'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Empreinte SHA-256 des entrées du prompt (offre, compétences, bio, modèle)
+    cle = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    offre_id = db.Column(db.Integer, db.ForeignKey('offres_emploi.id', ondelete='CASCADE'), nullable=False)
+    candidat_id = db.Column(db.Integer, db.ForeignKey('candidats.id', ondelete='CASCADE'), nullable=False)
+    modele = db.Column(db.String(100), nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    justification = db.Column(db.String(200), nullable=False)
+    date_calcul = db.Column(db.DateTime, default=datetime.utcnow)
+    date_expiration = db.Column(db.DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        db.Index('ix_scores_compatibilite_paire', 'offre_id', 'candidat_id', 'modele'),
+    )
+    
+    def __repr__(self):
+        return f'<ScoreCompatibilite {self.candidat_id} -> {self.offre_id} ({self.score})>'
+
+class ScoreCorrespondance(db.Model):
+    """Matrice précalculée des scores offre/candidat, tenue à jour à chaque création"""
+    __tablename__ = 'match_scores'
+    
+    LOCAL = 'local'
+    IA = 'ia'
+    
+    offre_id = db.Column(db.Integer, db.ForeignKey('offres_emploi.id', ondelete='CASCADE'), primary_key=True)
+    candidat_id = db.Column(db.Integer, db.ForeignKey('candidats.id', ondelete='CASCADE'), primary_key=True)
+    score = db.Column(db.Integer, nullable=False)
+    methode = db.Column(db.String(10), nullable=False, default=LOCAL)
+    date_calcul = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Lecture du top-N d'une offre par parcours d'index
+        db.Index('ix_match_scores_offre_score', offre_id, score.desc()),
+        db.Index('ix_match_scores_candidat', 'candidat_id'),
+    )
+    
+    def __repr__(self):
+        return f'<ScoreCorrespondance {self.candidat_id} -> {self.offre_id} ({self.score}, {self.methode})>'
+
+class TacheAnalyse(db.Model):
+    """Tâche d'analyse IA exécutée en arrière-plan"""
+    __tablename__ = 'taches_analyse'
+    
+    EN_ATTENTE = 'en_attente'
+    EN_COURS = 'en_cours'
+    TERMINEE = 'terminee'
+    ECHOUEE = 'echouee'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    offre_id = db.Column(db.Integer, db.ForeignKey('offres_emploi.id', ondelete='CASCADE'), nullable=False)
+    candidat_id = db.Column(db.Integer, db.ForeignKey('candidats.id', ondelete='CASCADE'), nullable=False)
+    statut = db.Column(db.String(20), nullable=False, default=EN_ATTENTE, index=True)
+    resultat = db.Column(db.JSON, nullable=True)
+    erreur = db.Column(db.Text, nullable=True)
+    date_creation = db.Column(db.DateTime, default=datetime.utcnow)
+    date_debut = db.Column(db.DateTime, nullable=True)
+    date_fin = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<TacheAnalyse {self.id} {self.statut}>'
\ No newline at end of file
@@ -1,6 +1,6 @@
 from marshmallow import Schema, fields, validate, validates, ValidationError
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
-from models.models import db, OffreEmploi, Candidat, Candidature
+from models.models import db, OffreEmploi, Candidat, Candidature, TacheAnalyse
 
 class OffreEmploiSchema(SQLAlchemyAutoSchema):
     """Schéma de validation pour les offres d'emploi"""
@@ -46,6 +46,12 @@ class CandidatureSchema(SQLAlchemyAutoSchema):
     candidat_id = fields.Int(required=True)
     offre_id = fields.Int(required=True)
 
+class TacheAnalyseSchema(SQLAlchemyAutoSchema):
+    """Schéma de sérialisation des tâches d'analyse"""
+    class Meta:
+        model = TacheAnalyse
+        include_fk = True
+
 # Instances des schémas
 offre_schema = OffreEmploiSchema()
 offres_schema = OffreEmploiSchema(many=True)
@@ -53,6 +59,7 @@ candidat_schema = CandidatSchema()
 candidats_schema = CandidatSchema(many=True)
 candidature_schema = CandidatureSchema()
 candidatures_schema = CandidatureSchema(many=True)
+tache_schema = TacheAnalyseSchema()
 
 # Schémas pour les réponses
 class MatchAnalysisSchema(Schema):
@@ -1,9 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models.models import db, Candidature, Candidat, OffreEmploi
-from models.schemas import candidature_schema
+from models.schemas import CandidatureSchema, candidature_schema
+from services.export_service import ExportService
+from services.bulk_service import BulkImportService, lire_lignes
+from services.query_service import champs_demandes, projeter, schema_projete, filtrer_plage, parse_date, paginer, reponse_paginee
 from marshmallow import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 
 application_bp = Blueprint('applications', __name__)
+export_service = ExportService()
+bulk_service = BulkImportService()
+
+def _serialiser_candidatures(applications, fields=None):
+    """Sérialise des candidatures avec le résumé du candidat et de l'offre"""
+    result = schema_projete(CandidatureSchema, fields).dump(applications)
+    
+    for app, app_data in zip(applications, result):
+        if not fields or 'candidat' in fields:
+            app_data['candidat'] = {
+                'id': app.candidat.id,
+                'nom': app.candidat.nom,
+                'email': app.candidat.email
+            }
+        if not fields or 'offre' in fields:
+            app_data['offre'] = {
+                'id': app.offre.id,
+                'titre': app.offre.titre
+            }
+    return result
 
 @application_bp.route('/apply', methods=['POST'])
 def create_application():
@@ -58,27 +83,82 @@ def create_application():
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
+@application_bp.route('/applications/bulk', methods=['POST'])
+def bulk_create_applications():
+    """
+    Import en masse de candidatures
+    
+    Corps : tableau JSON ou NDJSON (Content-Type: application/x-ndjson).
+    Retourne un rapport par ligne (identifiants créés, erreurs de validation).
+    """
+    try:
+        lignes = lire_lignes(request, current_app.config['BULK_MAX_ROWS'])
+        return jsonify(bulk_service.importer_candidatures(lignes)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
 @application_bp.route('/applications', methods=['GET'])
 def get_applications():
-    """Récupérer toutes les candidatures"""
+    """
+    Récupérer les candidatures (paginé)
+    
+    Paramètres : limit, cursor, fields (dont 'candidat' et 'offre'), offre_id, candidat_id,
+    date_min, date_max (date de dépôt)
+    """
     try:
-        applications = Candidature.query.all()
-        result = []
+        fields = champs_demandes(request.args, CandidatureSchema, extras=('candidat', 'offre'))
+        # Les clés étrangères restent chargées pour les objets imbriqués
+        query = projeter(Candidature.query, Candidature, fields and fields + ('candidat_id', 'offre_id'))
         
-        for app in applications:
-            app_data = candidature_schema.dump(app)
-            app_data['candidat'] = {
-                'id': app.candidat.id,
-                'nom': app.candidat.nom,
-                'email': app.candidat.email
-            }
-            app_data['offre'] = {
-                'id': app.offre.id,
-                'titre': app.offre.titre
-            }
-            result.append(app_data)
+        # Chargement des relations dans la même requête (pas de N+1)
+        if not fields or 'candidat' in fields:
+            query = query.options(joinedload(Candidature.candidat, innerjoin=True)
+                                  .load_only(Candidat.id, Candidat.nom, Candidat.email))
+        if not fields or 'offre' in fields:
+            query = query.options(joinedload(Candidature.offre, innerjoin=True)
+                                  .load_only(OffreEmploi.id, OffreEmploi.titre))
         
-        return jsonify(result), 200
+        offre_id = request.args.get('offre_id', type=int)
+        if offre_id is not None:
+            query = query.filter(Candidature.offre_id == offre_id)
+        candidat_id = request.args.get('candidat_id', type=int)
+        if candidat_id is not None:
+            query = query.filter(Candidature.candidat_id == candidat_id)
+        query = filtrer_plage(query, Candidature.date_depot,
+                              parse_date(request.args, 'date_min'), parse_date(request.args, 'date_max'))
         
+        applications, next_cursor = paginer(query, Candidature.id, request.args)
+        return reponse_paginee(_serialiser_candidatures(applications, fields), next_cursor), 200
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@application_bp.route('/applications/export', methods=['GET'])
+def export_applications():
+    """
+    Exporter toutes les candidatures en flux
+    
+    Paramètres : format (ndjson par défaut, ou json), gzip=1 pour compresser
+    """
+    try:
+        query = (select(Candidature)
+                 .options(joinedload(Candidature.candidat, innerjoin=True)
+                          .load_only(Candidat.id, Candidat.nom, Candidat.email),
+                          joinedload(Candidature.offre, innerjoin=True)
+                          .load_only(OffreEmploi.id, OffreEmploi.titre))
+                 .order_by(Candidature.id))
+        return export_service.stream(
+            query,
+            _serialiser_candidatures,
+            format=request.args.get('format', 'ndjson'),
+            compresser=request.args.get('gzip') == '1'
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
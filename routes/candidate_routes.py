@@ -1,10 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models.models import db, Candidat
-from models.schemas import candidat_schema, candidats_schema
+from models.schemas import CandidatSchema, candidat_schema, candidats_schema
+from sqlalchemy import select
 from services.database_service import DatabaseService
+from services.skill_index_service import SkillIndexService
+from services.match_service import get_match_scores
+from services.export_service import ExportService
+from services.bulk_service import BulkImportService, lire_lignes
+from services.query_service import champs_demandes, projeter, schema_projete, filtrer_plage, parse_date, paginer, reponse_paginee
 
 candidate_bp = Blueprint('candidates', __name__)
 db_service = DatabaseService()
+skill_index = SkillIndexService()
+export_service = ExportService()
+bulk_service = BulkImportService()
 
 @candidate_bp.route('/candidates', methods=['POST'])
 def create_candidate():
@@ -23,22 +32,80 @@ def create_candidate():
         # Validation avec Marshmallow (fournir la session SQLAlchemy pour la désérialisation)
         candidate = candidat_schema.load(data, session=db.session)
         
-        # Sauvegarde en base
+        # Sauvegarde en base (avec mise à jour de l'index des compétences)
         db.session.add(candidate)
+        db.session.flush()
+        skill_index.indexer_candidat(candidate)
         db.session.commit()
         
+        # Scores du nouveau candidat calculés en arrière-plan
+        get_match_scores().rafraichir_candidats([candidate.id])
+        
         return jsonify(candidat_schema.dump(candidate)), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
+@candidate_bp.route('/candidates/bulk', methods=['POST'])
+def bulk_create_candidates():
+    """
+    Import en masse de candidats
+    
+    Corps : tableau JSON ou NDJSON (Content-Type: application/x-ndjson).
+    Retourne un rapport par ligne (identifiants créés, erreurs de validation).
+    """
+    try:
+        lignes = lire_lignes(request, current_app.config['BULK_MAX_ROWS'])
+        rapport = bulk_service.importer_candidats(lignes)
+        get_match_scores().rafraichir_candidats(item['id'] for item in rapport['ids'])
+        return jsonify(rapport), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
 @candidate_bp.route('/candidates', methods=['GET'])
 def get_candidates():
-    """Récupérer tous les candidats"""
+    """
+    Récupérer les candidats (paginé)
+    
+    Paramètres : limit, cursor, fields, diplome, date_min, date_max (date d'inscription)
+    """
     try:
-        candidates = Candidat.query.all()
-        return jsonify(candidats_schema.dump(candidates)), 200
+        fields = champs_demandes(request.args, CandidatSchema)
+        query = projeter(Candidat.query, Candidat, fields)
+        
+        diplome = request.args.get('diplome')
+        if diplome:
+            query = query.filter(Candidat.diplome == diplome)
+        query = filtrer_plage(query, Candidat.date_inscription,
+                              parse_date(request.args, 'date_min'), parse_date(request.args, 'date_max'))
+        
+        candidates, next_cursor = paginer(query, Candidat.id, request.args)
+        return reponse_paginee(schema_projete(CandidatSchema, fields).dump(candidates), next_cursor), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@candidate_bp.route('/candidates/export', methods=['GET'])
+def export_candidates():
+    """
+    Exporter tous les candidats en flux
+    
+    Paramètres : format (ndjson par défaut, ou json), gzip=1 pour compresser
+    """
+    try:
+        return export_service.stream(
+            select(Candidat).order_by(Candidat.id),
+            candidats_schema.dump,
+            format=request.args.get('format', 'ndjson'),
+            compresser=request.args.get('gzip') == '1'
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,60 @@
+import time
+from flask import Blueprint, request, jsonify, current_app
+from models.models import db, TacheAnalyse, OffreEmploi, Candidat
+from models.schemas import tache_schema
+from services.job_service import get_job_service
+
+job_bp = Blueprint('jobs', __name__)
+
+@job_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """Soumettre une analyse de compatibilité en arrière-plan"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Données JSON requises"}), 400
+        
+        offre_id = data.get('offre_id')
+        candidat_id = data.get('candidat_id')
+        if not offre_id or not candidat_id:
+            return jsonify({"error": "offre_id et candidat_id sont requis"}), 400
+        
+        if not db.session.get(OffreEmploi, offre_id):
+            return jsonify({"error": "Offre non trouvée"}), 404
+        if not db.session.get(Candidat, candidat_id):
+            return jsonify({"error": "Candidat non trouvé"}), 404
+        
+        job = get_job_service().submit(offre_id, candidat_id)
+        
+        response = jsonify(tache_schema.dump(job))
+        response.headers['Location'] = f"/api/jobs/{job.id}"
+        return response, 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+@job_bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Consulter l'état d'une tâche d'analyse
+    
+    Le paramètre optionnel ?wait=<secondes> attend (long-poll) la fin de la tâche.
+    """
+    try:
+        wait = min(request.args.get('wait', 0, type=float), current_app.config.get('JOB_MAX_WAIT', 30))
+        deadline = time.monotonic() + wait
+        
+        while True:
+            job = db.session.get(TacheAnalyse, job_id, populate_existing=True)
+            if job is None:
+                return jsonify({"error": "Tâche non trouvée"}), 404
+            if job.statut in (TacheAnalyse.TERMINEE, TacheAnalyse.ECHOUEE) or time.monotonic() >= deadline:
+                break
+            db.session.rollback()
+            time.sleep(0.1)
+        
+        return jsonify(tache_schema.dump(job)), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
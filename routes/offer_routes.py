@@ -1,9 +1,23 @@
-from flask import Blueprint, request, jsonify
-from models.models import db, OffreEmploi, Candidature
-from models.schemas import offre_schema, offres_schema, candidats_schema
-from services.services import AIService
+from flask import Blueprint, request, jsonify, current_app
+from models.models import db, OffreEmploi, Candidat, Candidature
+from models.schemas import OffreEmploiSchema, offre_schema, candidat_schema, candidats_schema
+from services.ranking_service import RankingService, analyser_compatibilite
+from services.match_service import get_match_scores
+from services.skill_index_service import SkillIndexService
+from services.bulk_service import BulkImportService, lire_lignes
+from services.query_service import champs_demandes, projeter, schema_projete, filtrer_plage, parse_date, parse_float, paginer, reponse_paginee
 
 offer_bp = Blueprint('offers', __name__)
+skill_index = SkillIndexService()
+bulk_service = BulkImportService()
+
+def _candidats_de_l_offre(offer_id):
+    """Candidats ayant postulé à une offre, par ordre de candidature (jointure unique)"""
+    return (Candidat.query
+            .join(Candidature, Candidature.candidat_id == Candidat.id)
+            .filter(Candidature.offre_id == offer_id)
+            .order_by(Candidature.id)
+            .all())
 
 @offer_bp.route('/offers', methods=['POST'])
 def create_offer():
@@ -16,22 +30,59 @@ def create_offer():
         # Validation avec Marshmallow
         offer = offre_schema.load(data, session=db.session)
         
-        # Sauvegarde en base
+        # Sauvegarde en base (avec mise à jour de l'index des compétences)
         db.session.add(offer)
+        db.session.flush()
+        skill_index.indexer_offre(offer)
         db.session.commit()
         
+        # Scores de la nouvelle offre calculés en arrière-plan
+        get_match_scores().rafraichir_offres([offer.id])
+        
         return jsonify(offre_schema.dump(offer)), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
 
+@offer_bp.route('/offers/bulk', methods=['POST'])
+def bulk_create_offers():
+    """
+    Import en masse d'offres
+    
+    Corps : tableau JSON ou NDJSON (Content-Type: application/x-ndjson).
+    Retourne un rapport par ligne (identifiants créés, erreurs de validation).
+    """
+    try:
+        lignes = lire_lignes(request, current_app.config['BULK_MAX_ROWS'])
+        rapport = bulk_service.importer_offres(lignes)
+        get_match_scores().rafraichir_offres(item['id'] for item in rapport['ids'])
+        return jsonify(rapport), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
 @offer_bp.route('/offers', methods=['GET'])
 def get_offers():
-    """Récupérer toutes les offres"""
+    """
+    Récupérer les offres (paginé)
+    
+    Paramètres : limit, cursor, fields, salaire_min, salaire_max, date_min, date_max (date de création)
+    """
     try:
-        offers = OffreEmploi.query.all()
-        return jsonify(offres_schema.dump(offers)), 200
+        fields = champs_demandes(request.args, OffreEmploiSchema)
+        query = projeter(OffreEmploi.query, OffreEmploi, fields)
+        query = filtrer_plage(query, OffreEmploi.salaire,
+                              parse_float(request.args, 'salaire_min'), parse_float(request.args, 'salaire_max'))
+        query = filtrer_plage(query, OffreEmploi.date_creation,
+                              parse_date(request.args, 'date_min'), parse_date(request.args, 'date_max'))
+        
+        offers, next_cursor = paginer(query, OffreEmploi.id, request.args)
+        return reponse_paginee(schema_projete(OffreEmploiSchema, fields).dump(offers), next_cursor), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -51,17 +102,56 @@ def get_offer_candidates(offer_id):
         # Vérifier que l'offre existe
         offer = OffreEmploi.query.get_or_404(offer_id)
         
-        # Récupérer les candidatures pour cette offre
-        applications = Candidature.query.filter_by(offre_id=offer_id).all()
-        
-        # Extraire les candidats
-        candidates = [app.candidat for app in applications]
+        # Récupérer les candidats ayant postulé (une seule requête)
+        candidates = _candidats_de_l_offre(offer_id)
         
         return jsonify(candidats_schema.dump(candidates)), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@offer_bp.route('/offers/<int:offer_id>/matching-candidates', methods=['GET'])
+def get_matching_candidates(offer_id):
+    """Candidats dont les compétences recoupent celles de l'offre (index inversé)"""
+    try:
+        OffreEmploi.query.get_or_404(offer_id)
+        
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        offset = request.args.get('offset', 0, type=int)
+        
+        result = []
+        for candidat, communes in skill_index.candidats_correspondants(offer_id, limit=limit, offset=offset):
+            candidat_data = candidat_schema.dump(candidat)
+            candidat_data['competences_communes'] = communes
+            result.append(candidat_data)
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@offer_bp.route('/offers/<int:offer_id>/top-candidates', methods=['GET'])
+def get_top_candidates(offer_id):
+    """Meilleurs candidats d'une offre, lus dans la matrice des scores précalculés"""
+    try:
+        OffreEmploi.query.get_or_404(offer_id)
+        
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        offset = request.args.get('offset', 0, type=int)
+        
+        result = []
+        for candidat, match in get_match_scores().top_candidats(offer_id, limit=limit, offset=offset):
+            candidat_data = candidat_schema.dump(candidat)
+            candidat_data['score'] = match.score
+            candidat_data['methode'] = match.methode
+            candidat_data['date_calcul'] = match.date_calcul.isoformat() if match.date_calcul else None
+            result.append(candidat_data)
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @offer_bp.route('/offers/<int:offer_id>/analyze-match', methods=['POST'])
 def analyze_match(offer_id):
     """Analyser la compatibilité entre une offre et un candidat"""
@@ -79,21 +169,34 @@ def analyze_match(offer_id):
             return jsonify({"error": "candidat_id est requis"}), 400
         
         # Récupérer le candidat
-        from models.models import Candidat
         candidat = Candidat.query.get_or_404(candidat_id)
         
-        # Initialiser le service IA
-        ai_service = AIService()
-        
-        # Analyser la compatibilité
-        result = ai_service.analyze_compatibility(
-            offre_description=offer.description,
-            candidat_bio=candidat.bio,
-            offre_competences=offer.competences_cles
-        )
+        # Analyser la compatibilité (via le cache de scores)
+        result = analyser_compatibilite(offer, candidat)
         
         return jsonify(result), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@offer_bp.route('/offers/<int:offer_id>/rank', methods=['POST'])
+def rank_candidates(offer_id):
+    """Classer tous les candidats d'une offre par score de compatibilité"""
+    try:
+        offer = OffreEmploi.query.get_or_404(offer_id)
+        
+        candidates = _candidats_de_l_offre(offer_id)
+        
+        ranking_service = RankingService(
+            max_workers=current_app.config.get('RANK_MAX_WORKERS', 8),
+            batch_size=current_app.config.get('RANK_BATCH_SIZE', 10),
+            seuil=current_app.config.get('PRESCORE_THRESHOLD', 0),
+            top_k=current_app.config.get('PRESCORE_TOP_K')
+        )
+        return jsonify(ranking_service.rank(offer, candidates)), 200
+        
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify, send_file
+from services.profiling_service import get_profiling
+
+profiling_bp = Blueprint('profiling', __name__)
+
+@profiling_bp.route('/', methods=['GET'])
+def list_reports():
+    """Index des rapports de profilage enregistrés"""
+    return jsonify(get_profiling().lister()), 200
+
+@profiling_bp.route('/<string:name>.collapsed', methods=['GET'])
+def get_collapsed_stacks(name):
+    """Piles repliées d'un rapport (entrée de flamegraph.pl / speedscope)"""
+    path = get_profiling().chemin_rapport(name, 'collapsed')
+    if not path:
+        return jsonify({"error": "Rapport non trouvé"}), 404
+    return send_file(path, mimetype='text/plain')
+
+@profiling_bp.route('/<string:name>', methods=['GET'])
+def get_report(name):
+    """Rapport détaillé : requêtes SQL, temps Marshmallow, fonctions les plus coûteuses"""
+    path = get_profiling().chemin_rapport(name, 'json')
+    if not path:
+        return jsonify({"error": "Rapport non trouvé"}), 404
+    return send_file(path, mimetype='application/json')
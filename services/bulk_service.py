@@ -0,0 +1,162 @@
+import json
+from marshmallow import ValidationError
+from sqlalchemy import insert, select, tuple_
+from typing import Any, Dict, List, Set, Tuple
+from models.models import db, Candidat, OffreEmploi, Candidature
+from models.schemas import CandidatSchema, OffreEmploiSchema, CandidatureSchema
+from services.skill_index_service import SkillIndexService
+
+# Lignes insérées (et validées) par transaction
+TAILLE_LOT_IMPORT = 1000
+
+def lire_lignes(request, max_lignes: int) -> List[Any]:
+    """Lit le corps d'une requête d'import : tableau JSON ou NDJSON (une ligne par objet)"""
+    if request.mimetype == 'application/x-ndjson':
+        lignes = []
+        for numero, ligne in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if ligne.strip():
+                try:
+                    lignes.append(json.loads(ligne))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Ligne {numero} : JSON invalide ({e.msg})")
+    else:
+        lignes = request.get_json(silent=True)
+        if not isinstance(lignes, list):
+            raise ValueError("Un tableau JSON ou un flux NDJSON est requis")
+
+    if not lignes:
+        raise ValueError("Aucune ligne à importer")
+    if len(lignes) > max_lignes:
+        raise ValueError(f"Trop de lignes ({len(lignes)}), maximum {max_lignes}")
+    return lignes
+
+class BulkImportService:
+    """Import en masse : validation par lot, doublons résolus par requêtes ensemblistes, insertion groupée"""
+
+    def __init__(self, taille_lot: int = TAILLE_LOT_IMPORT):
+        self.taille_lot = taille_lot
+        self.skill_index = SkillIndexService()
+
+    def importer_candidats(self, lignes: List[Any]) -> Dict[str, Any]:
+        """Importe des candidats ; les emails déjà présents (en base ou dans le lot) sont rejetés"""
+        rapport = _rapport(len(lignes))
+        schema = CandidatSchema()
+
+        for debut, lot in self._lots(lignes):
+            valides = self._valider(schema, lot, debut, rapport, ('nom', 'email', 'bio', 'diplome'))
+
+            emails = [ligne['email'] for _, ligne in valides]
+            existants = set(db.session.execute(
+                select(Candidat.email).where(Candidat.email.in_(emails))
+            ).scalars())
+
+            a_inserer = []
+            for index, ligne in valides:
+                if ligne['email'] in existants:
+                    _rejeter(rapport, index, {"email": ["Un candidat avec cet email existe déjà"]})
+                else:
+                    existants.add(ligne['email'])
+                    a_inserer.append((index, ligne))
+
+            ids = self._inserer(Candidat, a_inserer, rapport)
+            self.skill_index.indexer_candidats([(i, ligne['bio']) for i, (_, ligne) in zip(ids, a_inserer)])
+            db.session.commit()
+
+        return rapport
+
+    def importer_offres(self, lignes: List[Any]) -> Dict[str, Any]:
+        """Importe des offres d'emploi"""
+        rapport = _rapport(len(lignes))
+        schema = OffreEmploiSchema()
+
+        for debut, lot in self._lots(lignes):
+            valides = self._valider(schema, lot, debut, rapport,
+                                    ('titre', 'description', 'competences_cles', 'salaire'))
+            ids = self._inserer(OffreEmploi, valides, rapport)
+            for offre in OffreEmploi.query.filter(OffreEmploi.id.in_(ids)):
+                self.skill_index.indexer_offre(offre)
+            db.session.commit()
+
+        return rapport
+
+    def importer_candidatures(self, lignes: List[Any]) -> Dict[str, Any]:
+        """Importe des candidatures ; candidats/offres inconnus et doublons sont rejetés"""
+        rapport = _rapport(len(lignes))
+        schema = CandidatureSchema()
+
+        for debut, lot in self._lots(lignes):
+            valides = self._valider(schema, lot, debut, rapport, ('candidat_id', 'offre_id'))
+
+            candidat_ids = {ligne['candidat_id'] for _, ligne in valides}
+            offre_ids = {ligne['offre_id'] for _, ligne in valides}
+            candidats = set(db.session.execute(
+                select(Candidat.id).where(Candidat.id.in_(candidat_ids))
+            ).scalars())
+            offres = set(db.session.execute(
+                select(OffreEmploi.id).where(OffreEmploi.id.in_(offre_ids))
+            ).scalars())
+            paires = [(ligne['candidat_id'], ligne['offre_id']) for _, ligne in valides]
+            existantes: Set[Tuple[int, int]] = set(db.session.execute(
+                select(Candidature.candidat_id, Candidature.offre_id)
+                .where(tuple_(Candidature.candidat_id, Candidature.offre_id).in_(paires))
+            ).all()) if paires else set()
+
+            a_inserer = []
+            for index, ligne in valides:
+                paire = (ligne['candidat_id'], ligne['offre_id'])
+                if paire[0] not in candidats:
+                    _rejeter(rapport, index, {"candidat_id": ["Candidat non trouvé"]})
+                elif paire[1] not in offres:
+                    _rejeter(rapport, index, {"offre_id": ["Offre non trouvée"]})
+                elif paire in existantes:
+                    _rejeter(rapport, index, {"_schema": ["Candidature déjà existante"]})
+                else:
+                    existantes.add(paire)
+                    a_inserer.append((index, ligne))
+
+            self._inserer(Candidature, a_inserer, rapport)
+            db.session.commit()
+
+        return rapport
+
+    def _lots(self, lignes: List[Any]):
+        for debut in range(0, len(lignes), self.taille_lot):
+            yield debut, lignes[debut:debut + self.taille_lot]
+
+    @staticmethod
+    def _valider(schema, lot: List[Any], debut: int, rapport: Dict[str, Any], colonnes: Tuple[str, ...]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Valide chaque ligne avec le schéma Marshmallow ; retourne les lignes valides indexées"""
+        valides = []
+        for index, ligne in enumerate(lot, start=debut):
+            if not isinstance(ligne, dict):
+                _rejeter(rapport, index, {"_schema": ["Objet JSON attendu"]})
+                continue
+            try:
+                # Instance transitoire : types désérialisés, sans accès à la session
+                instance = schema.load(ligne, transient=True)
+            except ValidationError as e:
+                _rejeter(rapport, index, e.messages)
+                continue
+            valides.append((index, {c: getattr(instance, c) for c in colonnes}))
+        return valides
+
+    @staticmethod
+    def _inserer(model, lignes: List[Tuple[int, Dict[str, Any]]], rapport: Dict[str, Any]) -> List[int]:
+        """INSERT groupé (executemany) ; retourne les identifiants dans l'ordre des lignes"""
+        if not lignes:
+            return []
+        ids = list(db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [ligne for _, ligne in lignes]
+        ))
+        for (index, _), nouvel_id in zip(lignes, ids):
+            rapport['ids'].append({"index": index, "id": nouvel_id})
+        rapport['crees'] += len(ids)
+        return ids
+
+def _rapport(total: int) -> Dict[str, Any]:
+    return {"total": total, "crees": 0, "rejetes": 0, "ids": [], "erreurs": []}
+
+def _rejeter(rapport: Dict[str, Any], index: int, erreurs: Dict[str, Any]) -> None:
+    rapport['rejetes'] += 1
+    rapport['erreurs'].append({"index": index, "erreurs": erreurs})
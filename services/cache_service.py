@@ -0,0 +1,109 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from typing import Dict, Any, Optional
+from models.models import db, ScoreCompatibilite
+from services.services import AIService
+
+class ScoreCacheService:
+    """Cache des scores IA : LRU en mémoire devant la table scores_compatibilite"""
+
+    def __init__(self, ttl: int = 86400, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits_memoire": 0, "hits_bdd": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(model_name: str, offre, candidat) -> str:
+        """
+        Calcule la clé de cache d'une paire offre/candidat
+
+        La clé couvre toutes les entrées du prompt ainsi que la date de
+        modification de l'offre : toute modification invalide l'entrée.
+        """
+        date_modification = offre.date_modification.isoformat() if offre.date_modification else ''
+        payload = json.dumps(
+            [model_name, offre.description, offre.competences_cles or [], candidat.bio, date_modification],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat en cache ou None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._lru.move_to_end(key)
+                    self.stats["hits_memoire"] += 1
+                    return dict(result)
+                del self._lru[key]
+
+        # Repli sur la table persistante
+        row = ScoreCompatibilite.query.filter_by(cle=key).first()
+        if row is not None and row.date_expiration > datetime.utcnow():
+            result = {"score": row.score, "justification": row.justification, "statut": AIService.STATUT_SCORE}
+            remaining = (row.date_expiration - datetime.utcnow()).total_seconds()
+            self._remember(key, result, now + remaining)
+            with self._lock:
+                self.stats["hits_bdd"] += 1
+            return dict(result)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, offre_id: int, candidat_id: int, model_name: str, result: Dict[str, Any]) -> None:
+        """Enregistre un résultat en mémoire et en base (les résultats dégradés sont ignorés)"""
+        if result.get('statut') == AIService.STATUT_DEGRADE:
+            return
+        self._remember(key, result, time.monotonic() + self.ttl)
+
+        try:
+            # Les anciens scores de la paire (bio ou offre modifiée) sont obsolètes
+            ScoreCompatibilite.query.filter(
+                ScoreCompatibilite.offre_id == offre_id,
+                ScoreCompatibilite.candidat_id == candidat_id,
+                ScoreCompatibilite.modele == model_name
+            ).delete(synchronize_session=False)
+            ScoreCompatibilite.query.filter(
+                ScoreCompatibilite.date_expiration <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.session.add(ScoreCompatibilite(
+                cle=key,
+                offre_id=offre_id,
+                candidat_id=candidat_id,
+                modele=model_name,
+                score=result['score'],
+                justification=result['justification'][:200],
+                date_expiration=datetime.utcnow() + timedelta(seconds=self.ttl)
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f"Impossible d'enregistrer le score en cache: {e}")
+
+    def clear(self) -> None:
+        """Vide le cache mémoire"""
+        with self._lock:
+            self._lru.clear()
+
+    def _remember(self, key: str, result: Dict[str, Any], expires_at: float) -> None:
+        with self._lock:
+            self._lru[key] = (expires_at, dict(result))
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+                self.stats["evictions"] += 1
+
+def get_score_cache() -> ScoreCacheService:
+    """Retourne le cache de scores de l'application courante"""
+    return current_app.extensions['score_cache']
@@ -1,5 +1,31 @@
+import threading
+import time
 from models.models import db
 from contextlib import contextmanager
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure l'attente pour obtenir une connexion"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.metrics = {"checkouts": 0, "attente_totale_ms": 0.0, "attente_max_ms": 0.0, "timeouts": 0}
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._metrics_lock:
+                self.metrics["timeouts"] += 1
+            raise
+        finally:
+            waited_ms = (time.perf_counter() - start) * 1000
+            with self._metrics_lock:
+                self.metrics["checkouts"] += 1
+                self.metrics["attente_totale_ms"] += waited_ms
+                self.metrics["attente_max_ms"] = max(self.metrics["attente_max_ms"], waited_ms)
 
 class DatabaseService:
     """Service pour la gestion de la base de données"""
@@ -14,8 +40,7 @@ class DatabaseService:
         except Exception as e:
             session.rollback()
             raise e
-        finally:
-            session.close()
+        # La session est partagée (scoped_session) : Flask-SQLAlchemy la libère en fin de requête
     
     def create_tables(self):
         """Créer toutes les tables"""
@@ -29,4 +54,24 @@ class DatabaseService:
         """Initialiser la base de données avec l'application"""
         db.init_app(app)
         with app.app_context():
-            self.create_tables()
\ No newline at end of file
+            self.create_tables()
+    
+    def pool_metrics(self):
+        """État du pool de connexions du moteur courant"""
+        pool = db.engine.pool
+        metrics = {"pool": type(pool).__name__, "status": pool.status()}
+        if isinstance(pool, QueuePool):
+            metrics.update({
+                "taille": pool.size(),
+                "connexions_utilisees": pool.checkedout(),
+                "connexions_disponibles": pool.checkedin(),
+                "debordement": pool.overflow(),
+            })
+        if isinstance(pool, InstrumentedQueuePool):
+            with pool._metrics_lock:
+                stats = dict(pool.metrics)
+            stats["attente_moyenne_ms"] = round(stats["attente_totale_ms"] / stats["checkouts"], 3) if stats["checkouts"] else 0.0
+            stats["attente_totale_ms"] = round(stats["attente_totale_ms"], 3)
+            stats["attente_max_ms"] = round(stats["attente_max_ms"], 3)
+            metrics.update(stats)
+        return metrics
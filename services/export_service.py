@@ -0,0 +1,69 @@
+import json
+import zlib
+from flask import Response, stream_with_context
+from typing import Any, Callable, Dict, Iterator, List
+from models.models import db
+
+# Lignes lues par aller-retour avec le curseur serveur
+TAILLE_LOT_EXPORT = 1000
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+class ExportService:
+    """Export en flux d'une collection : mémoire bornée, premier octet immédiat"""
+
+    def __init__(self, taille_lot: int = TAILLE_LOT_EXPORT):
+        self.taille_lot = taille_lot
+
+    def stream(self, query, serialiser: Callable[[List[Any]], List[Dict[str, Any]]],
+               format: str = 'ndjson', compresser: bool = False) -> Response:
+        """
+        Réponse HTTP en flux pour une requête select()
+
+        Args:
+            query: requête select() des objets à exporter
+            serialiser: transforme un lot d'objets en liste de dicts
+            format: 'ndjson' (une ligne par objet) ou 'json' (tableau écrit au fil de l'eau)
+            compresser: compression gzip à la volée
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Format inconnu: {format} (ndjson ou json)")
+
+        chunks = self._lignes(query, serialiser, format)
+        if compresser:
+            chunks = self._gzip(chunks)
+
+        response = Response(stream_with_context(chunks), mimetype=FORMATS[format])
+        if compresser:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    def _lignes(self, query, serialiser, format: str) -> Iterator[bytes]:
+        result = db.session.execute(query.execution_options(yield_per=self.taille_lot))
+        premier = True
+        if format == 'json':
+            yield b'['
+        for lot in result.scalars().partitions():
+            items = serialiser(lot)
+            if format == 'ndjson':
+                yield ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in items).encode('utf-8')
+            elif items:
+                prefixe = '' if premier else ','
+                yield (prefixe + ','.join(json.dumps(item, ensure_ascii=False) for item in items)).encode('utf-8')
+                premier = False
+            # Les objets du lot ne sont plus nécessaires
+            db.session.expunge_all()
+        if format == 'json':
+            yield b']'
+
+    @staticmethod
+    def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        compresseur = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compresseur.compress(chunk)
+            if data:
+                yield data
+        yield compresseur.flush()
@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from models.models import db, TacheAnalyse, OffreEmploi, Candidat
+from services.ranking_service import analyser_compatibilite
+
+class JobService:
+    """File de tâches d'analyse IA persistée en base et exécutée par un pool de threads local"""
+
+    def __init__(self, app, max_workers: int = 4):
+        self.app = app
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, offre_id: int, candidat_id: int) -> TacheAnalyse:
+        """Enregistre une tâche et la confie au pool ; retourne immédiatement"""
+        job = TacheAnalyse(offre_id=offre_id, candidat_id=candidat_id)
+        db.session.add(job)
+        db.session.commit()
+        self._get_executor().submit(self._run, job.id)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le pool de threads"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Création paresseuse : aucun thread tant qu'aucune tâche n'est soumise
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='analyse-ia'
+                )
+            return self._executor
+
+    def _run(self, job_id: int) -> None:
+        with self.app.app_context():
+            # Réservation atomique : un seul worker (ou processus) exécute la tâche
+            claimed = TacheAnalyse.query.filter_by(id=job_id, statut=TacheAnalyse.EN_ATTENTE).update(
+                {"statut": TacheAnalyse.EN_COURS, "date_debut": datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.session.commit()
+            if not claimed:
+                return
+
+            job = db.session.get(TacheAnalyse, job_id)
+            try:
+                offer = db.session.get(OffreEmploi, job.offre_id)
+                candidat = db.session.get(Candidat, job.candidat_id)
+                if offer is None or candidat is None:
+                    raise ValueError("Offre ou candidat introuvable")
+
+                job.resultat = analyser_compatibilite(offer, candidat)
+                job.statut = TacheAnalyse.TERMINEE
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(TacheAnalyse, job_id)
+                current_app.logger.error(f"Échec de la tâche d'analyse {job_id}: {e}")
+                job.statut = TacheAnalyse.ECHOUEE
+                job.erreur = str(e)
+
+            job.date_fin = datetime.utcnow()
+            db.session.commit()
+            db.session.remove()
+
+def get_job_service() -> JobService:
+    """Retourne la file de tâches de l'application courante"""
+    return current_app.extensions['jobs']
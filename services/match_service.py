@@ -0,0 +1,166 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as attendre_futures
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select
+from typing import Dict, Iterable, List, Tuple
+from models.models import db, Candidat, OffreEmploi, ScoreCorrespondance
+from services.scoring_service import LocalScorer
+
+# Lignes chargées puis écrites par lot lors d'un rafraîchissement
+TAILLE_LOT_SCORES = 1000
+
+class MatchScoreService:
+    """
+    Matrice des scores offre/candidat précalculée en arrière-plan
+
+    Une création ne recalcule que sa ligne (offre) ou sa colonne (candidat), avec
+    la méthode la moins coûteuse (score local) ; les scores IA obtenus ensuite
+    remplacent le score local de la paire.
+    """
+
+    def __init__(self, app, max_workers: int = 1, taille_lot: int = TAILLE_LOT_SCORES):
+        self.app = app
+        self.max_workers = max(1, max_workers)
+        self.taille_lot = taille_lot
+        self.scorer = LocalScorer()
+        self._executor = None
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.stats = {"rafraichissements": 0, "paires_calculees": 0, "erreurs": 0}
+
+    def rafraichir_offres(self, offre_ids: Iterable[int]) -> None:
+        """Planifie le calcul des scores des offres créées contre tous les candidats"""
+        offre_ids = list(offre_ids)
+        for debut in range(0, len(offre_ids), self.taille_lot):
+            self._soumettre(self._calculer_offres, offre_ids[debut:debut + self.taille_lot])
+
+    def rafraichir_candidats(self, candidat_ids: Iterable[int]) -> None:
+        """Planifie le calcul des scores des candidats créés contre toutes les offres"""
+        candidat_ids = list(candidat_ids)
+        for debut in range(0, len(candidat_ids), self.taille_lot):
+            self._soumettre(self._calculer_candidats, candidat_ids[debut:debut + self.taille_lot])
+
+    def top_candidats(self, offre_id: int, limit: int = 50, offset: int = 0) -> List[Tuple[Candidat, ScoreCorrespondance]]:
+        """Meilleurs candidats d'une offre (parcours de l'index (offre_id, score DESC))"""
+        return db.session.execute(
+            select(Candidat, ScoreCorrespondance)
+            .join(ScoreCorrespondance, ScoreCorrespondance.candidat_id == Candidat.id)
+            .where(ScoreCorrespondance.offre_id == offre_id)
+            .order_by(ScoreCorrespondance.score.desc(), ScoreCorrespondance.candidat_id)
+            .limit(limit)
+            .offset(offset)
+        ).all()
+
+    def enregistrer_ia(self, offre_id: int, scores: Dict[int, int]) -> None:
+        """Remplace les scores locaux des paires par les scores IA (transaction de l'appelant)"""
+        if not scores:
+            return
+        db.session.execute(ScoreCorrespondance.__table__.delete().where(
+            ScoreCorrespondance.offre_id == offre_id,
+            ScoreCorrespondance.candidat_id.in_(list(scores))
+        ))
+        maintenant = datetime.utcnow()
+        db.session.execute(ScoreCorrespondance.__table__.insert(), [
+            {"offre_id": offre_id, "candidat_id": candidat_id, "score": score,
+             "methode": ScoreCorrespondance.IA, "date_calcul": maintenant}
+            for candidat_id, score in scores.items()
+        ])
+
+    def reconstruire(self) -> int:
+        """Recalcule toute la matrice (scores locaux) ; retourne le nombre de paires"""
+        ids = db.session.execute(select(OffreEmploi.id).order_by(OffreEmploi.id)).scalars().all()
+        total = 0
+        for debut in range(0, len(ids), self.taille_lot):
+            total += self._calculer(OffreEmploi, ids[debut:debut + self.taille_lot])
+        return total
+
+    def attendre(self, timeout: float = None) -> None:
+        """Attend la fin des rafraîchissements planifiés (tests, commandes CLI)"""
+        with self._lock:
+            futures = list(self._futures)
+        attendre_futures(futures, timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le pool de threads"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def _soumettre(self, fn, ids: List[int]) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='match-scores')
+            future = self._executor.submit(fn, ids)
+            self._futures.add(future)
+        future.add_done_callback(self._terminer)
+
+    def _terminer(self, future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def _calculer_offres(self, offre_ids: List[int]) -> None:
+        self._executer(OffreEmploi, offre_ids)
+
+    def _calculer_candidats(self, candidat_ids: List[int]) -> None:
+        self._executer(Candidat, candidat_ids)
+
+    def _executer(self, model, ids: List[int]) -> None:
+        with self.app.app_context():
+            try:
+                self._calculer(model, ids)
+                with self._lock:
+                    self.stats["rafraichissements"] += 1
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error("Échec du calcul des scores (%s %s): %s", model.__tablename__, ids, e)
+                with self._lock:
+                    self.stats["erreurs"] += 1
+            finally:
+                db.session.remove()
+
+    def _calculer(self, model, ids: List[int]) -> int:
+        """
+        Calcule les paires des entités données contre toute l'autre table, lot par lot
+
+        Les scores IA existants sont conservés ; les scores locaux sont remplacés.
+        """
+        entites = db.session.execute(select(model).where(model.id.in_(ids))).scalars().all()
+        if not entites:
+            return 0
+        autre = Candidat if model is OffreEmploi else OffreEmploi
+        colonne = ScoreCorrespondance.offre_id if model is OffreEmploi else ScoreCorrespondance.candidat_id
+
+        # Paires déjà scorées par l'IA : à ne pas écraser
+        paires_ia = set(db.session.execute(
+            select(ScoreCorrespondance.offre_id, ScoreCorrespondance.candidat_id)
+            .where(colonne.in_(ids), ScoreCorrespondance.methode == ScoreCorrespondance.IA)
+        ).all())
+        db.session.execute(ScoreCorrespondance.__table__.delete().where(
+            colonne.in_(ids), ScoreCorrespondance.methode == ScoreCorrespondance.LOCAL
+        ))
+
+        total = 0
+        maintenant = datetime.utcnow()
+        result = db.session.execute(select(autre).order_by(autre.id).execution_options(yield_per=self.taille_lot))
+        for lot in result.scalars().partitions():
+            offres, candidats = (entites, lot) if model is OffreEmploi else (lot, entites)
+            lignes = [
+                {"offre_id": offre_id, "candidat_id": candidat_id, "score": score,
+                 "methode": ScoreCorrespondance.LOCAL, "date_calcul": maintenant}
+                for offre_id, candidat_id, score in self.scorer.scorer_paires(offres, candidats)
+                if (offre_id, candidat_id) not in paires_ia
+            ]
+            if lignes:
+                db.session.execute(ScoreCorrespondance.__table__.insert(), lignes)
+            total += len(lignes)
+        db.session.commit()
+
+        with self._lock:
+            self.stats["paires_calculees"] += total
+        return total
+
+def get_match_scores() -> MatchScoreService:
+    """Retourne le service de scores précalculés de l'application courante"""
+    return current_app.extensions['match_scores']
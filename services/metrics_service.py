@@ -0,0 +1,167 @@
+import bisect
+import threading
+import time
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from typing import Callable, Dict, Optional, Tuple
+
+# Bornes des histogrammes (secondes pour les latences, octets pour les tailles)
+LATENCE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TAILLE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{n}="{_echapper(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _echapper(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Counter:
+    """Compteur monotone, éventuellement étiqueté"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield f'{self.name}{_labels(self.labels, label_values)} {value}'
+
+class Histogram:
+    """Histogramme à bornes fixes (cumulatif au rendu, comme Prometheus)"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            serie = self._series.get(label_values)
+            if serie is None:
+                # [compte par borne..., +Inf, somme]
+                serie = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[index] += 1
+            serie[-1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = [(k, list(v)) for k, v in self._series.items()]
+        for label_values, serie in series:
+            cumul = 0
+            for borne, compte in zip(self.buckets + ('+Inf',), serie[:-1]):
+                cumul += compte
+                le = f'le="{borne}"'
+                yield f'{self.name}_bucket{_labels(self.labels, label_values, le)} {cumul}'
+            yield f'{self.name}_sum{_labels(self.labels, label_values)} {serie[-1]}'
+            yield f'{self.name}_count{_labels(self.labels, label_values)} {cumul}'
+
+class CallbackMetric:
+    """Métrique lue au moment du rendu (état d'un cache, d'un pool...)"""
+
+    def __init__(self, name: str, help: str, type: str, label: str, callback: Callable[[], Dict[str, float]]):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.label = label
+        self.callback = callback
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.type}'
+        try:
+            values = self.callback()
+        except Exception:
+            return
+        for label_value, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield f'{self.name}{_labels((self.label,), (label_value,))} {value}'
+
+class MetricsRegistry:
+    """Registre de métriques en mémoire, exposé au format texte Prometheus"""
+
+    def __init__(self):
+        self._metrics = []
+        self.requests = self._add(Histogram(
+            'smartrecruit_http_request_duration_seconds', 'Durée des requêtes HTTP',
+            ('blueprint', 'route', 'method', 'status')))
+        self.response_size = self._add(Histogram(
+            'smartrecruit_http_response_size_bytes', 'Taille des réponses HTTP',
+            ('route',), buckets=TAILLE_BUCKETS))
+        self.sql = self._add(Histogram(
+            'smartrecruit_sql_query_duration_seconds', 'Durée des requêtes SQL', ('operation',)))
+        self.ai_calls = self._add(Histogram(
+            'smartrecruit_ai_call_duration_seconds', 'Durée des appels Gemini', ('operation', 'outcome')))
+        self.ai_tokens = self._add(Counter(
+            'smartrecruit_ai_tokens_total', 'Tokens consommés par les appels Gemini', ('type',)))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_callback(self, name: str, help: str, type: str, label: str,
+                          callback: Callable[[], Dict[str, float]]) -> None:
+        self._add(CallbackMetric(name, help, type, label, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def init_app(self, app) -> None:
+        """Branche les hooks de requête et de base de données"""
+        app.extensions['metrics'] = self
+
+        @app.before_request
+        def _metrics_start():
+            g._metrics_start = time.perf_counter()
+
+        @app.after_request
+        def _metrics_record(response):
+            start = g.pop('_metrics_start', None)
+            if start is not None:
+                route = request.url_rule.rule if request.url_rule else 'inconnue'
+                self.requests.observe(time.perf_counter() - start, request.blueprint or 'app',
+                                      route, request.method, str(response.status_code))
+                if not response.is_streamed and response.content_length is not None:
+                    self.response_size.observe(response.content_length, route)
+            return response
+
+    def instrument_engine(self, engine) -> None:
+        """Mesure les requêtes SQL via les événements du moteur"""
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _sql_start(conn, cursor, statement, parameters, context, executemany):
+            context._metrics_start = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _sql_end(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, '_metrics_start', None)
+            if start is not None:
+                operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'AUTRE'
+                self.sql.observe(time.perf_counter() - start, operation)
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """Registre de l'application courante (None hors contexte applicatif)"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('metrics')
@@ -0,0 +1,203 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, has_request_context, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from sqlalchemy import event
+from typing import Any, Dict, List, Optional
+
+# En-tête portant le jeton signé qui active le profilage d'une requête
+PROFILE_HEADER = 'X-Profile-Token'
+
+# Période d'échantillonnage des piles (secondes)
+SAMPLE_INTERVAL = 0.001
+
+class StackSampler(threading.Thread):
+    """Échantillonne la pile d'un thread pour produire des piles repliées (flamegraph)"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class RequestProfile:
+    """Profil d'une requête : cProfile, piles échantillonnées et requêtes SQL"""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident())
+        self.sql: List[Dict[str, Any]] = []
+        self.start = time.perf_counter()
+
+    def begin(self):
+        self.sampler.start()
+        self.profiler.enable()
+
+    def end(self):
+        self.profiler.disable()
+        self.sampler.stop()
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+
+    def rapport(self, status: int) -> Dict[str, Any]:
+        stats = pstats.Stats(self.profiler)
+        fonctions = []
+        marshmallow_ms = 0.0
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            # Temps de sérialisation : appels de premier niveau à Schema.dump
+            if name == 'dump' and filename.endswith(os.path.join('marshmallow', 'schema.py')):
+                marshmallow_ms += cumtime * 1000
+            fonctions.append({
+                "fonction": f"{name} ({os.path.basename(filename)}:{line})",
+                "appels": ncalls,
+                "temps_propre_ms": round(tottime * 1000, 3),
+                "temps_cumule_ms": round(cumtime * 1000, 3),
+            })
+        fonctions.sort(key=lambda f: f["temps_cumule_ms"], reverse=True)
+
+        return {
+            "methode": request.method,
+            "chemin": request.full_path.rstrip('?'),
+            "route": request.url_rule.rule if request.url_rule else None,
+            "statut": status,
+            "date": datetime.utcnow().isoformat(),
+            "duree_ms": round(self.duration_ms, 3),
+            "sql_total_ms": round(sum(q["duree_ms"] for q in self.sql), 3),
+            "sql_requetes": len(self.sql),
+            "sql": self.sql,
+            "marshmallow_ms": round(marshmallow_ms, 3),
+            "echantillons": sum(self.sampler.stacks.values()),
+            "top_fonctions": fonctions[:50],
+        }
+
+    def piles_repliees(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.sampler.stacks.most_common())
+
+class ProfilingService:
+    """Profilage à la demande des requêtes HTTP, rapports enregistrés dans un répertoire local"""
+
+    def __init__(self, app):
+        self.mode = app.config.get('PROFILING_MODE', 'off')
+        self.directory = app.config.get('PROFILING_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='profiling')
+        self.token_max_age = app.config.get('PROFILING_TOKEN_MAX_AGE', 3600)
+
+    def creer_jeton(self) -> str:
+        """Jeton signé à placer dans l'en-tête X-Profile-Token"""
+        return self.serializer.dumps('profile')
+
+    def init_app(self, app) -> None:
+        """Branche les hooks ; rien n'est enregistré lorsque le profilage est désactivé"""
+        app.extensions['profiling'] = self
+        if self.mode == 'off':
+            return
+
+        @app.before_request
+        def _profiling_start():
+            if self._demande_profilage():
+                g._profile = RequestProfile()
+                g._profile.begin()
+
+        @app.after_request
+        def _profiling_end(response):
+            profile = g.pop('_profile', None)
+            if profile is not None:
+                profile.end()
+                nom = self._enregistrer(profile, response.status_code)
+                response.headers['X-Profile-Report'] = nom
+            return response
+
+        with app.app_context():
+            from models.models import db
+            self._instrumenter_sql(db.engine)
+
+    def lister(self) -> List[Dict[str, Any]]:
+        """Résumé des rapports enregistrés, du plus récent au plus ancien"""
+        if not os.path.isdir(self.directory):
+            return []
+        rapports = []
+        for fichier in sorted(os.listdir(self.directory), reverse=True):
+            if fichier.endswith('.json'):
+                with open(os.path.join(self.directory, fichier), encoding='utf-8') as f:
+                    data = json.load(f)
+                rapports.append({
+                    "nom": fichier[:-len('.json')],
+                    "methode": data["methode"],
+                    "chemin": data["chemin"],
+                    "duree_ms": data["duree_ms"],
+                    "sql_total_ms": data["sql_total_ms"],
+                    "marshmallow_ms": data["marshmallow_ms"],
+                })
+        return rapports
+
+    def chemin_rapport(self, nom: str, extension: str) -> Optional[str]:
+        """Chemin d'un rapport existant (le nom est validé pour rester dans le répertoire)"""
+        if not re.fullmatch(r'[\w.-]+', nom):
+            return None
+        chemin = os.path.join(self.directory, f"{nom}.{extension}")
+        return chemin if os.path.isfile(chemin) else None
+
+    def _demande_profilage(self) -> bool:
+        if self.mode == 'always':
+            return not request.path.startswith('/profiling')
+        token = request.headers.get(PROFILE_HEADER)
+        if not token:
+            return False
+        try:
+            return self.serializer.loads(token, max_age=self.token_max_age) == 'profile'
+        except (BadSignature, SignatureExpired):
+            return False
+
+    def _enregistrer(self, profile: RequestProfile, status: int) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        route = re.sub(r'[^\w]+', '_', request.path).strip('_') or 'racine'
+        nom = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{request.method}-{route}"
+        with open(os.path.join(self.directory, f"{nom}.json"), 'w', encoding='utf-8') as f:
+            json.dump(profile.rapport(status), f, ensure_ascii=False, indent=2)
+        with open(os.path.join(self.directory, f"{nom}.collapsed"), 'w', encoding='utf-8') as f:
+            f.write(profile.piles_repliees())
+        return nom
+
+    @staticmethod
+    def _instrumenter_sql(engine) -> None:
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _sql_start(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context() and g.get('_profile') is not None:
+                context._profile_start = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _sql_end(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, '_profile_start', None)
+            profile = g.get('_profile') if has_request_context() else None
+            if start is not None and profile is not None:
+                profile.sql.append({
+                    "requete": statement,
+                    "duree_ms": round((time.perf_counter() - start) * 1000, 3),
+                })
+
+def get_profiling() -> ProfilingService:
+    return current_app.extensions['profiling']
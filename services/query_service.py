@@ -0,0 +1,92 @@
+from datetime import datetime
+from functools import lru_cache
+from flask import current_app, jsonify, request
+from sqlalchemy.orm import load_only
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlencode
+
+def paginer(query, id_column, args) -> Tuple[list, Optional[int]]:
+    """
+    Pagination par curseur (keyset sur l'identifiant)
+
+    ?limit=N borne la page (API_PAGE_SIZE par défaut, API_MAX_PAGE_SIZE au plus),
+    ?cursor=<id> reprend après le dernier identifiant reçu.
+
+    Returns:
+        (éléments de la page, curseur suivant ou None si dernière page)
+    """
+    limit = args.get('limit', current_app.config['API_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+
+    cursor = args.get('cursor')
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise ValueError("Paramètre 'cursor' invalide")
+        query = query.filter(id_column > int(cursor))
+
+    items = query.order_by(id_column).limit(limit + 1).all()
+    next_cursor = items[limit - 1].id if len(items) > limit else None
+    return items[:limit], next_cursor
+
+def champs_demandes(args, schema_class, extras: Tuple[str, ...] = ()) -> Optional[Tuple[str, ...]]:
+    """Champs demandés via ?fields=a,b,c (None si tous), validés contre le schéma"""
+    raw = args.get('fields')
+    if not raw:
+        return None
+
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    inconnus = set(fields) - set(schema_class._declared_fields) - set(extras)
+    if inconnus:
+        raise ValueError(f"Champs inconnus: {', '.join(sorted(inconnus))}")
+    return fields
+
+def projeter(query, model, fields: Optional[Tuple[str, ...]]):
+    """Ne charge que les colonnes demandées (l'identifiant est toujours chargé pour le curseur)"""
+    if not fields:
+        return query
+    colonnes = [getattr(model, f) for f in fields if f in model.__table__.columns.keys() and f != 'id']
+    return query.options(load_only(model.id, *colonnes))
+
+@lru_cache(maxsize=64)
+def schema_projete(schema_class, fields: Optional[Tuple[str, ...]]):
+    """Instance de schéma (many=True) limitée aux champs demandés, mise en cache"""
+    if not fields:
+        return schema_class(many=True)
+    return schema_class(many=True, only=[f for f in fields if f in schema_class._declared_fields])
+
+def filtrer_plage(query, column, minimum: Optional[Any], maximum: Optional[Any]):
+    """Filtre column entre minimum et maximum (bornes incluses, ignorées si None)"""
+    if minimum is not None:
+        query = query.filter(column >= minimum)
+    if maximum is not None:
+        query = query.filter(column <= maximum)
+    return query
+
+def parse_date(args, name: str) -> Optional[datetime]:
+    """Lit un paramètre date ISO 8601 (ex. 2026-01-31 ou 2026-01-31T12:00:00)"""
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Paramètre '{name}' invalide (date ISO 8601 attendue)")
+
+def parse_float(args, name: str) -> Optional[float]:
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Paramètre '{name}' invalide (nombre attendu)")
+
+def reponse_paginee(data: List[Any], next_cursor: Optional[int]):
+    """Réponse JSON (liste) avec le curseur suivant dans les en-têtes X-Next-Cursor et Link"""
+    response = jsonify(data)
+    if next_cursor is not None:
+        args = request.args.to_dict()
+        args['cursor'] = str(next_cursor)
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
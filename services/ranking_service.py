@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from typing import Dict, Any, List, Optional
+from services.services import AIService
+from services.cache_service import get_score_cache
+from services.match_service import get_match_scores
+from models.models import db
+from services.scoring_service import LocalScorer
+
+def analyser_compatibilite(offer, candidat) -> Dict[str, Any]:
+    """Analyse une paire offre/candidat en passant par le cache de scores"""
+    score_cache = get_score_cache()
+    model_name = current_app.config.get('GEMINI_MODEL', 'gemini-pro')
+    cache_key = score_cache.make_key(model_name, offer, candidat)
+    cached = score_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    ai_service = AIService()
+    result = ai_service.analyze_compatibility(
+        offre_description=offer.description,
+        candidat_bio=candidat.bio,
+        offre_competences=offer.competences_cles
+    )
+
+    if result.get('statut') != AIService.STATUT_DEGRADE:
+        score_cache.set(cache_key, offer.id, candidat.id, model_name, result)
+        _enregistrer_scores_ia(offer.id, {candidat.id: result['score']})
+    return result
+
+def _enregistrer_scores_ia(offre_id: int, scores: Dict[int, int]) -> None:
+    """Reporte les scores IA dans la matrice précalculée (sans bloquer la réponse en cas d'échec)"""
+    try:
+        get_match_scores().enregistrer_ia(offre_id, scores)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Impossible de mettre à jour la matrice des scores: {e}")
+
+class RankingService:
+    """Service de classement des candidats d'une offre par score de compatibilité"""
+
+    def __init__(self, max_workers: int = 8, batch_size: int = 10, seuil: int = 0, top_k: Optional[int] = None):
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.seuil = seuil
+        self.top_k = top_k
+        self.scorer = LocalScorer()
+
+    def rank(self, offer, candidats: list) -> List[Dict[str, Any]]:
+        """
+        Classe les candidats d'une offre par score décroissant
+
+        Un score local écarte d'abord les non-correspondances évidentes : seuls
+        les top_k candidats au-dessus du seuil sont soumis à l'IA. Les scores en
+        cache sont réutilisés ; les autres candidats retenus sont regroupés par
+        lots (un prompt multi-candidats par lot) analysés en parallèle. Un
+        résultat IA dégradé est remplacé par le score local.
+        """
+        score_cache = get_score_cache()
+        model_name = current_app.config.get('GEMINI_MODEL', 'gemini-pro')
+
+        top_k = self.top_k if self.top_k is not None else len(candidats)
+        retenus, scores_locaux = self.scorer.prefiltrer(offer, candidats, self.seuil, top_k)
+        retenus = {c.id for c in retenus}
+
+        scores = {}
+        methodes = {}
+        keys = {}
+        a_analyser = []
+        for candidat in candidats:
+            keys[candidat.id] = score_cache.make_key(model_name, offer, candidat)
+            cached = score_cache.get(keys[candidat.id])
+            if cached is not None:
+                scores[candidat.id] = cached
+                methodes[candidat.id] = 'ia'
+            elif candidat.id in retenus:
+                a_analyser.append({"id": candidat.id, "bio": candidat.bio})
+                methodes[candidat.id] = 'ia'
+            else:
+                scores[candidat.id] = scores_locaux[candidat.id]
+                methodes[candidat.id] = 'local'
+
+        if a_analyser:
+            ai_service = AIService()
+            app = current_app._get_current_object()
+            lots = [a_analyser[i:i + self.batch_size] for i in range(0, len(a_analyser), self.batch_size)]
+
+            def analyser_lot(lot):
+                with app.app_context():
+                    return ai_service.analyze_compatibility_batch(
+                        offre_description=offer.description,
+                        candidats=lot,
+                        offre_competences=offer.competences_cles
+                    )
+
+            scores_ia = {}
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(lots))) as executor:
+                for resultats in executor.map(analyser_lot, lots):
+                    for candidat_id, result in resultats.items():
+                        if result.get('statut') == AIService.STATUT_DEGRADE:
+                            scores[candidat_id] = scores_locaux[candidat_id]
+                            methodes[candidat_id] = 'local'
+                            continue
+                        scores[candidat_id] = result
+                        scores_ia[candidat_id] = result['score']
+                        score_cache.set(keys[candidat_id], offer.id, candidat_id, model_name, result)
+            _enregistrer_scores_ia(offer.id, scores_ia)
+
+        classement = [
+            {
+                "candidat_id": candidat.id,
+                "nom": candidat.nom,
+                "email": candidat.email,
+                "score": scores[candidat.id]['score'],
+                "justification": scores[candidat.id]['justification'],
+                "methode": methodes[candidat.id]
+            }
+            for candidat in candidats
+        ]
+        classement.sort(key=lambda item: item['score'], reverse=True)
+        return classement
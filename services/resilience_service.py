@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple, Type
+
+class UpstreamUnavailable(Exception):
+    """Le service distant n'a pas pu être appelé (panne, circuit ouvert, limite atteinte)"""
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Appel refusé sans tentative : le circuit est ouvert"""
+
+class RateLimitExceeded(UpstreamUnavailable):
+    """Appel refusé : trop d'appels simultanés ou par minute"""
+
+class CircuitBreaker:
+    """
+    Disjoncteur : après `seuil` échecs consécutifs, les appels sont refusés pendant
+    `delai_reouverture` secondes, puis un seul appel d'essai est autorisé (semi-ouvert)
+    """
+
+    FERME = 'ferme'
+    OUVERT = 'ouvert'
+    SEMI_OUVERT = 'semi_ouvert'
+
+    def __init__(self, seuil: int = 5, delai_reouverture: float = 30.0, horloge: Callable[[], float] = time.monotonic):
+        self.seuil = max(1, seuil)
+        self.delai_reouverture = delai_reouverture
+        self.horloge = horloge
+        self._etat = self.FERME
+        self._echecs = 0
+        self._ouvert_depuis = 0.0
+        self._essai_en_cours = False
+        self._lock = threading.Lock()
+
+    @property
+    def etat(self) -> str:
+        with self._lock:
+            if self._etat == self.OUVERT and self.horloge() - self._ouvert_depuis >= self.delai_reouverture:
+                return self.SEMI_OUVERT
+            return self._etat
+
+    def autoriser(self) -> bool:
+        """Indique si un appel peut être tenté (réserve l'appel d'essai en semi-ouvert)"""
+        with self._lock:
+            if self._etat == self.FERME:
+                return True
+            if self._etat == self.OUVERT:
+                if self.horloge() - self._ouvert_depuis < self.delai_reouverture:
+                    return False
+                self._etat = self.SEMI_OUVERT
+            if self._essai_en_cours:
+                return False
+            self._essai_en_cours = True
+            return True
+
+    def succes(self) -> None:
+        with self._lock:
+            self._etat = self.FERME
+            self._echecs = 0
+            self._essai_en_cours = False
+
+    def echec(self) -> None:
+        with self._lock:
+            self._echecs += 1
+            if self._etat == self.SEMI_OUVERT or self._echecs >= self.seuil:
+                self._etat = self.OUVERT
+                self._ouvert_depuis = self.horloge()
+            self._essai_en_cours = False
+
+class TokenBucket:
+    """Seau à jetons : au plus `par_minute` appels par minute, rafales comprises"""
+
+    def __init__(self, par_minute: int, horloge: Callable[[], float] = time.monotonic):
+        self.capacite = float(par_minute)
+        self.debit = par_minute / 60.0
+        self.horloge = horloge
+        self._jetons = self.capacite
+        self._derniere = horloge()
+        self._lock = threading.Lock()
+
+    def acquerir(self, timeout: float) -> bool:
+        """Prend un jeton, en attendant au plus `timeout` secondes"""
+        limite = self.horloge() + timeout
+        while True:
+            with self._lock:
+                maintenant = self.horloge()
+                self._jetons = min(self.capacite, self._jetons + (maintenant - self._derniere) * self.debit)
+                self._derniere = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return True
+                attente = (1 - self._jetons) / self.debit
+            if maintenant + attente > limite:
+                return False
+            time.sleep(attente)
+
+class ResilientCaller:
+    """
+    Appels protégés vers un service distant : délai par tentative, réessais bornés avec
+    backoff exponentiel et gigue, disjoncteur, limites de concurrence et de débit
+    """
+
+    def __init__(self, timeout: float = 20.0, deadline: float = 60.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 seuil_circuit: int = 5, delai_circuit: float = 30.0,
+                 max_concurrence: int = 8, par_minute: int = 0, attente_max: float = 10.0,
+                 reessayables: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError)):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.attente_max = attente_max
+        self.reessayables = reessayables
+        self.circuit = CircuitBreaker(seuil_circuit, delai_circuit)
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrence))
+        self._bucket = TokenBucket(par_minute) if par_minute > 0 else None
+        self._lock = threading.Lock()
+        self.stats = {"appels": 0, "reessais": 0, "echecs": 0, "refus_circuit": 0, "refus_limite": 0}
+
+    def call(self, fn: Callable[[float], Any]) -> Any:
+        """
+        Exécute fn(timeout) avec les protections
+
+        Raises:
+            CircuitOpenError / RateLimitExceeded: appel refusé sans tentative
+            UpstreamUnavailable: erreurs réessayables épuisées ou délai global dépassé
+            Exception: toute erreur non réessayable levée par fn
+        """
+        debut = time.monotonic()
+        if not self._semaphore.acquire(timeout=self.attente_max):
+            self._compter("refus_limite")
+            raise RateLimitExceeded("Trop d'appels simultanés au service IA")
+        try:
+            if self._bucket is not None and not self._bucket.acquerir(self.attente_max):
+                self._compter("refus_limite")
+                raise RateLimitExceeded("Limite d'appels par minute au service IA atteinte")
+
+            tentative = 0
+            while True:
+                if not self.circuit.autoriser():
+                    self._compter("refus_circuit")
+                    raise CircuitOpenError("Service IA indisponible (circuit ouvert)")
+
+                restant = self.deadline - (time.monotonic() - debut)
+                self._compter("appels")
+                try:
+                    result = fn(max(0.1, min(self.timeout, restant)))
+                except self.reessayables as e:
+                    self.circuit.echec()
+                    self._compter("echecs")
+                    attente = self._backoff(tentative)
+                    restant = self.deadline - (time.monotonic() - debut)
+                    if tentative >= self.max_retries or attente >= restant:
+                        raise UpstreamUnavailable(f"Service IA indisponible après {tentative + 1} tentative(s): {e}") from e
+                    tentative += 1
+                    self._compter("reessais")
+                    time.sleep(attente)
+                    continue
+                except Exception:
+                    # Erreur non réessayable (requête invalide...) : le service a bien répondu
+                    self.circuit.succes()
+                    raise
+                self.circuit.succes()
+                return result
+        finally:
+            self._semaphore.release()
+
+    def etat(self) -> Dict[str, Any]:
+        """Compteurs et état du disjoncteur"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["circuit"] = self.circuit.etat
+        return stats
+
+    def _backoff(self, tentative: int) -> float:
+        # Gigue complète : tirage uniforme entre 0 et le plafond exponentiel
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** tentative)))
+
+    def _compter(self, nom: str) -> None:
+        with self._lock:
+            self.stats[nom] += 1
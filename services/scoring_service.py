@@ -0,0 +1,156 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Variantes d'écriture ramenées à une forme canonique (après normalisation)
+SYNONYMES = {
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "pg": "postgresql",
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "py": "python",
+    "python3": "python",
+    "ml": "machine learning",
+    "apprentissage automatique": "machine learning",
+    "ia": "intelligence artificielle",
+    "ai": "intelligence artificielle",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "mongo": "mongodb",
+    "sklearn": "scikit-learn",
+    "gcp": "google cloud",
+}
+
+# Mots vides ignorés dans le calcul TF-IDF
+MOTS_VIDES = {
+    "de", "des", "du", "la", "le", "les", "un", "une", "et", "en", "a", "au", "aux",
+    "pour", "avec", "dans", "sur", "par", "ans", "d", "l", "the", "and", "of", "in", "with",
+}
+
+# Longueur maximale (en mots) d'une compétence composée, ex. "machine learning"
+NGRAM_MAX = 3
+
+class LocalScorer:
+    """Moteur de score local et déterministe, utilisé pour filtrer les candidats avant l'IA"""
+
+    def __init__(self, synonymes: Optional[Dict[str, str]] = None):
+        self.synonymes = dict(SYNONYMES)
+        if synonymes:
+            self.synonymes.update({self.normaliser(k): self.normaliser(v) for k, v in synonymes.items()})
+
+    @staticmethod
+    def normaliser(texte: str) -> str:
+        """Minuscules, sans accents, ponctuation réduite à des espaces (sauf + # .)"""
+        texte = unicodedata.normalize('NFKD', texte or '')
+        texte = ''.join(c for c in texte if not unicodedata.combining(c)).lower()
+        texte = re.sub(r"[^a-z0-9+#.\-]+", " ", texte)
+        # Un point n'est conservé qu'à l'intérieur d'un mot (node.js, vue.js)
+        texte = re.sub(r"\.(?!\w)|(?<!\w)\.", " ", texte)
+        return ' '.join(texte.split())
+
+    def canonique(self, competence: str) -> str:
+        """Forme canonique d'une compétence"""
+        forme = self.normaliser(competence)
+        return self.synonymes.get(forme, forme)
+
+    def termes(self, texte: str) -> List[str]:
+        """Termes canoniques d'un texte : mots et groupes de mots jusqu'à NGRAM_MAX"""
+        mots = self.normaliser(texte).split()
+        termes = []
+        for n in range(1, NGRAM_MAX + 1):
+            for i in range(len(mots) - n + 1):
+                terme = ' '.join(mots[i:i + n])
+                if n == 1 and terme in MOTS_VIDES:
+                    continue
+                termes.append(self.synonymes.get(terme, terme))
+        return termes
+
+    def vectoriser(self, termes: List[str], idf: Dict[str, float]) -> Dict[str, float]:
+        """Vecteur TF-IDF creux normalisé (dict terme -> poids)"""
+        compte = Counter(termes)
+        vecteur = {t: tf * idf.get(t, 1.0) for t, tf in compte.items()}
+        norme = math.sqrt(sum(p * p for p in vecteur.values())) or 1.0
+        return {t: p / norme for t, p in vecteur.items()}
+
+    def scorer(self, offer, candidats: list) -> Dict[int, Dict[str, Any]]:
+        """
+        Score local (0-100) de chaque candidat pour une offre
+
+        Combine la part des compétences clés retrouvées dans la bio (70 %) et
+        la similarité cosinus TF-IDF entre la bio et l'offre (30 %). L'IDF est
+        calculé sur l'ensemble des candidats évalués.
+        """
+        competences = {self.canonique(c) for c in (offer.competences_cles or []) if c and c.strip()}
+        termes_candidats = {c.id: self.termes(c.bio) for c in candidats}
+
+        # IDF calculé une fois pour tout le lot
+        documents = len(candidats) + 1
+        frequences = Counter()
+        for termes in termes_candidats.values():
+            frequences.update(set(termes))
+        idf = {t: math.log(documents / (1 + df)) + 1.0 for t, df in frequences.items()}
+
+        termes_offre = self.termes(offer.description) + list(competences)
+        vecteur_offre = self.vectoriser(termes_offre, idf)
+
+        resultats = {}
+        for candidat_id, termes in termes_candidats.items():
+            score, presents = self._combiner(competences, termes, self.vectoriser(termes, idf), vecteur_offre)
+            resultats[candidat_id] = {
+                "score": score,
+                "competences": sorted(presents),
+                "justification": f"Score local : {len(presents)}/{len(competences)} compétences clés retrouvées."
+            }
+        return resultats
+
+    def scorer_paires(self, offres: list, candidats: list) -> Iterator[Tuple[int, int, int]]:
+        """
+        Scores locaux (offre_id, candidat_id, score) de toutes les paires, sans IDF de lot
+
+        Le score d'une paire ne dépend alors que de l'offre et du candidat : il peut
+        être stocké puis recalculé paire par paire, quel que soit le lot.
+        """
+        profils = []
+        for offer in offres:
+            competences = {self.canonique(c) for c in (offer.competences_cles or []) if c and c.strip()}
+            vecteur_offre = self.vectoriser(self.termes(offer.description) + list(competences), {})
+            profils.append((offer.id, competences, vecteur_offre))
+
+        for candidat in candidats:
+            termes = self.termes(candidat.bio)
+            vecteur = self.vectoriser(termes, {})
+            for offre_id, competences, vecteur_offre in profils:
+                score, _ = self._combiner(competences, termes, vecteur, vecteur_offre)
+                yield offre_id, candidat.id, score
+
+    @staticmethod
+    def _combiner(competences: set, termes: List[str], vecteur: Dict[str, float],
+                  vecteur_offre: Dict[str, float]) -> Tuple[int, set]:
+        """Score 0-100 : 70 % recouvrement des compétences clés, 30 % similarité cosinus"""
+        presents = competences.intersection(termes)
+        recouvrement = len(presents) / len(competences) if competences else 0.0
+        cosinus = sum(p * vecteur_offre.get(t, 0.0) for t, p in vecteur.items())
+        return int(round(100 * (0.7 * recouvrement + 0.3 * cosinus))), presents
+
+    def prefiltrer(self, offer, candidats: list, seuil: int, top_k: int) -> Tuple[list, Dict[int, Dict[str, Any]]]:
+        """
+        Sépare les candidats à envoyer à l'IA des non-correspondances évidentes
+
+        Returns:
+            (candidats retenus, au plus top_k avec un score local >= seuil,
+             scores locaux de tous les candidats)
+        """
+        scores = self.scorer(offer, candidats)
+        eligibles = [c for c in candidats if scores[c.id]['score'] >= seuil]
+        eligibles.sort(key=lambda c: scores[c.id]['score'], reverse=True)
+        return eligibles[:top_k], scores
@@ -1,11 +1,92 @@
 import json
+import threading
+import time
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from flask import current_app
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from services.metrics_service import get_metrics
+from services.resilience_service import ResilientCaller, UpstreamUnavailable, CircuitOpenError, RateLimitExceeded
+
+# Paramètres de sécurité pour éviter les blocages (faux positifs)
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+]
+
+# Erreurs Gemini transitoires, réessayées avec backoff
+ERREURS_REESSAYABLES = (
+    TimeoutError,
+    ConnectionError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+)
+
+def creer_caller(config) -> ResilientCaller:
+    """Couche de résilience des appels Gemini, paramétrée par la configuration"""
+    return ResilientCaller(
+        timeout=config.get('AI_TIMEOUT', 20),
+        deadline=config.get('AI_DEADLINE', 60),
+        max_retries=config.get('AI_MAX_RETRIES', 2),
+        backoff_base=config.get('AI_BACKOFF_BASE', 0.5),
+        backoff_max=config.get('AI_BACKOFF_MAX', 8),
+        seuil_circuit=config.get('AI_BREAKER_THRESHOLD', 5),
+        delai_circuit=config.get('AI_BREAKER_RESET', 30),
+        max_concurrence=config.get('AI_MAX_CONCURRENCY', 8),
+        par_minute=config.get('AI_RATE_PER_MINUTE', 0),
+        attente_max=config.get('AI_MAX_WAIT', 10),
+        reessayables=ERREURS_REESSAYABLES,
+    )
+
+class AIClientRegistry:
+    """Registre applicatif des clients Gemini : un client configuré par modèle, partagé entre threads"""
+    
+    def __init__(self, caller: Optional[ResilientCaller] = None):
+        self._models = {}
+        self._api_key = None
+        self._lock = threading.Lock()
+        self.stats = {"clients_crees": 0, "clients_reutilises": 0}
+        # Délais, réessais, disjoncteur et limites partagés par tous les appels de l'application
+        self.caller = caller or ResilientCaller(reessayables=ERREURS_REESSAYABLES)
+    
+    def get_model(self, model_name: str, api_key: str):
+        """Retourne le client du modèle, créé au premier appel puis réutilisé"""
+        with self._lock:
+            if api_key != self._api_key:
+                # Nouvelle clé : la configuration globale du SDK et les clients existants sont remplacés
+                genai.configure(api_key=api_key)
+                self._api_key = api_key
+                self._models.clear()
+            
+            model = self._models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+                self.stats["clients_crees"] += 1
+            else:
+                self.stats["clients_reutilises"] += 1
+            return model
+    
+    def warm_up(self, model_name: str, api_key: Optional[str]) -> None:
+        """Prépare le client au démarrage (sans effet si la clé API est absente)"""
+        if api_key:
+            self.get_model(model_name, api_key)
+
+def get_ai_registry() -> AIClientRegistry:
+    """Retourne le registre des clients Gemini de l'application courante"""
+    return current_app.extensions['ai_registry']
 
 class AIService:
     """Service pour l'intégration avec l'API Gemini"""
     
+    # Statut des résultats : 'score' (analyse réelle) ou 'degrade' (échec, score absent, jamais mis en cache)
+    STATUT_SCORE = 'score'
+    STATUT_DEGRADE = 'degrade'
+    
     def __init__(self):
         self.api_key = current_app.config.get('GEMINI_API_KEY')
         self.model_name = current_app.config.get('GEMINI_MODEL', 'gemini-pro')
@@ -13,9 +94,8 @@ class AIService:
         if not self.api_key:
             raise ValueError("Clé API Gemini non configurée")
         
-        # Configuration de l'API Gemini
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(self.model_name)
+        # Client Gemini partagé, configuré une seule fois par application
+        self.model = get_ai_registry().get_model(self.model_name, self.api_key)
     
     def analyze_compatibility(self, offre_description: str, candidat_bio: str, offre_competences: list = None) -> Dict[str, Any]:
         """
@@ -27,7 +107,7 @@ class AIService:
             offre_competences: Liste des compétences requises (optionnel)
             
         Returns:
-            Dict avec 'score' et 'justification'
+            Dict avec 'score', 'justification' et 'statut' ('degrade' : score None)
         """
         competences_str = ", ".join(offre_competences) if offre_competences else "Non spécifiées"
         
@@ -54,17 +134,9 @@ class AIService:
         }}
         """
         
-        # Paramètres de sécurité pour éviter les blocages (faux positifs)
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
-        ]
-        
         try:
             # Appel à l'API Gemini
-            response = self.model.generate_content(prompt, safety_settings=safety_settings)
+            response = self._generate(prompt, 'analyse')
             
             # Extraction du JSON de la réponse
             try:
@@ -72,10 +144,7 @@ class AIService:
             except ValueError:
                 # Si response.text échoue, c'est souvent dû aux filtres de sécurité
                 current_app.logger.warning(f"Réponse IA bloquée. Feedback: {response.prompt_feedback}")
-                return {
-                    "score": 0,
-                    "justification": "Analyse bloquée par les filtres de sécurité de l'IA."
-                }
+                return self._degrade("Analyse bloquée par les filtres de sécurité de l'IA.")
             
             # Nettoyage du texte pour extraire le JSON
             # Suppression des balises markdown si présentes
@@ -90,24 +159,7 @@ class AIService:
             # Parsing du JSON
             result = json.loads(response_text)
             
-            # Validation des données reçues
-            if 'score' not in result or 'justification' not in result:
-                raise ValueError("Réponse de l'IA mal formatée")
-            
-            # Nettoyage du score (si c'est une string "85%")
-            score_val = result['score']
-            if isinstance(score_val, str):
-                # On garde que les chiffres
-                score_val = ''.join(filter(str.isdigit, score_val))
-                if not score_val: score_val = "0"
-            
-            # S'assurer que le score est entre 0 et 100
-            result['score'] = max(0, min(100, int(score_val)))
-            
-            # Tronquer la justification si nécessaire
-            result['justification'] = result['justification'][:200]
-            
-            return result
+            return self._normaliser_resultat(result)
             
         except json.JSONDecodeError as e:
             current_app.logger.error(f"Erreur de parsing JSON de la réponse IA: {e}")
@@ -116,19 +168,142 @@ class AIService:
             match = re.search(r'score["\']?\s*:\s*(\d+)', response_text, re.IGNORECASE)
             if match:
                 return {
-                    "score": int(match.group(1)),
-                    "justification": "Score extrait partiellement (format IA non standard)."
+                    "score": max(0, min(100, int(match.group(1)))),
+                    "justification": "Score extrait partiellement (format IA non standard).",
+                    "statut": self.STATUT_SCORE
                 }
-            return {
-                "score": 0,
-                "justification": "Erreur lors de l'analyse de compatibilité"
-            }
+            return self._degrade("Erreur lors de l'analyse de compatibilité")
         except Exception as e:
             current_app.logger.error(f"Erreur lors de l'appel à l'API Gemini: {e}")
-            return {
-                "score": 0,
-                "justification": "Service d'analyse temporairement indisponible"
-            }
+            return self._degrade("Service d'analyse temporairement indisponible")
+    
+    def analyze_compatibility_batch(self, offre_description: str, candidats: List[Dict[str, Any]], offre_competences: list = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Analyse plusieurs candidats pour une même offre en un seul appel
+        
+        Args:
+            offre_description: Description de l'offre
+            candidats: Liste de dicts avec 'id' et 'bio'
+            offre_competences: Liste des compétences requises (optionnel)
+            
+        Returns:
+            Dict {candidat_id: {'score', 'justification', 'statut'}}. Les candidats absents
+            ou illisibles dans la réponse sont réanalysés individuellement, sauf si le
+            service est indisponible (tous les résultats sont alors dégradés).
+        """
+        competences_str = ", ".join(offre_competences) if offre_competences else "Non spécifiées"
+        candidats_str = "\n".join(f"- candidat_id {c['id']}: {c['bio']}" for c in candidats)
+        
+        prompt = f"""
+        Agis comme un expert en recrutement. Analyse la compatibilité entre cette offre et chacun des candidats.
+        
+        OFFRE:
+        Description: {offre_description}
+        Compétences techniques requises: {competences_str}
+        
+        CANDIDATS:
+        {candidats_str}
+        
+        Réponds UNIQUEMENT avec un tableau JSON valide (sans Markdown), un objet par candidat.
+        Les clés requises sont:
+        1. 'candidat_id': l'identifiant du candidat.
+        2. 'score': un entier de 0 à 100.
+        3. 'justification': une explication courte (max 200 caractères).
+        
+        Exemple de réponse:
+        [
+            {{"candidat_id": 12, "score": 85, "justification": "Le profil correspond bien aux attentes..."}}
+        ]
+        """
+        
+        results = {}
+        try:
+            response = self._generate(prompt, 'analyse_groupee')
+            response_text = response.text.strip().replace('```json', '').replace('```', '')
+            
+            start_idx = response_text.find('[')
+            end_idx = response_text.rfind(']')
+            if start_idx != -1 and end_idx != -1:
+                response_text = response_text[start_idx:end_idx+1]
+            
+            ids = {c['id'] for c in candidats}
+            for item in json.loads(response_text):
+                try:
+                    candidat_id = int(item['candidat_id'])
+                    if candidat_id in ids:
+                        results[candidat_id] = self._normaliser_resultat(item)
+                except (KeyError, TypeError, ValueError):
+                    continue
+        except UpstreamUnavailable as e:
+            # Inutile de multiplier les appels vers un service en panne
+            current_app.logger.warning(f"Analyse groupée impossible, service IA indisponible: {e}")
+            return {c['id']: self._degrade("Service d'analyse temporairement indisponible") for c in candidats}
+        except Exception as e:
+            current_app.logger.warning(f"Analyse groupée impossible, repli candidat par candidat: {e}")
+        
+        # Repli individuel pour les candidats manquants
+        for candidat in candidats:
+            if candidat['id'] not in results:
+                results[candidat['id']] = self.analyze_compatibility(
+                    offre_description=offre_description,
+                    candidat_bio=candidat['bio'],
+                    offre_competences=offre_competences
+                )
+        
+        return results
+    
+    def _generate(self, prompt: str, operation: str):
+        """Appel Gemini protégé (délai, réessais, disjoncteur, limites) et mesuré (durée, issue, tokens)"""
+        start = time.perf_counter()
+        outcome = 'erreur'
+        try:
+            response = get_ai_registry().caller.call(
+                lambda timeout: self.model.generate_content(
+                    prompt, safety_settings=SAFETY_SETTINGS, request_options={"timeout": timeout}
+                )
+            )
+            outcome = 'ok'
+            return response
+        except CircuitOpenError:
+            outcome = 'circuit_ouvert'
+            raise
+        except RateLimitExceeded:
+            outcome = 'limite'
+            raise
+        finally:
+            metrics = get_metrics()
+            if metrics is not None:
+                metrics.ai_calls.observe(time.perf_counter() - start, operation, outcome)
+                usage = getattr(response, 'usage_metadata', None) if outcome == 'ok' else None
+                if usage is not None:
+                    metrics.ai_tokens.inc(getattr(usage, 'prompt_token_count', 0) or 0, 'prompt')
+                    metrics.ai_tokens.inc(getattr(usage, 'candidates_token_count', 0) or 0, 'reponse')
+    
+    @staticmethod
+    def _normaliser_resultat(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Valide et normalise un résultat {'score', 'justification'} renvoyé par l'IA"""
+        # Validation des données reçues
+        if 'score' not in result or 'justification' not in result:
+            raise ValueError("Réponse de l'IA mal formatée")
+        
+        # Nettoyage du score (si c'est une string "85%")
+        score_val = result['score']
+        if isinstance(score_val, str):
+            # On garde que les chiffres
+            score_val = ''.join(filter(str.isdigit, score_val))
+            if not score_val: score_val = "0"
+        
+        # S'assurer que le score est entre 0 et 100, tronquer la justification si nécessaire
+        return {
+            "score": max(0, min(100, int(score_val))),
+            "justification": str(result['justification'])[:200],
+            "statut": AIService.STATUT_SCORE
+        }
+    
+    @staticmethod
+    def _degrade(justification: str) -> Dict[str, Any]:
+        """Résultat d'une analyse qui n'a pas pu aboutir (distinct d'un score réel de 0)"""
+        return {"score": None, "justification": justification, "statut": AIService.STATUT_DEGRADE}
     
     @staticmethod
     def get_ai_service() -> 'AIService':
@@ -0,0 +1,132 @@
+from sqlalchemy import func, select
+from typing import Dict, Iterable, List, Set, Tuple
+from models.models import db, Candidat, Competence, OffreEmploi, candidat_competences, offre_competences
+from services.scoring_service import LocalScorer
+
+# Taille des lots pour les clauses IN et le parcours des candidats
+TAILLE_LOT = 500
+
+class SkillIndexService:
+    """Index inversé compétence -> candidats / offres, maintenu à l'écriture"""
+
+    def __init__(self):
+        self.scorer = LocalScorer()
+
+    def indexer_offre(self, offre) -> None:
+        """Rattache l'offre à ses compétences clés (forme canonique)"""
+        noms = {self.scorer.canonique(c) for c in (offre.competences_cles or []) if c and c.strip()}
+        competences, nouvelles = self._get_or_create(noms)
+
+        db.session.execute(offre_competences.delete().where(offre_competences.c.offre_id == offre.id))
+        if competences:
+            db.session.execute(offre_competences.insert(), [
+                {"offre_id": offre.id, "competence_id": competence_id} for competence_id in competences.values()
+            ])
+
+        # Une compétence encore inconnue n'a pas pu être indexée pour les candidats existants
+        if nouvelles:
+            self._indexer_candidats_existants({nom: competences[nom] for nom in nouvelles})
+
+    def indexer_candidat(self, candidat) -> None:
+        """Rattache le candidat aux compétences du dictionnaire citées dans sa bio"""
+        self.indexer_candidats([(candidat.id, candidat.bio)])
+
+    def indexer_candidats(self, candidats: List[Tuple[int, str]]) -> None:
+        """Indexe un lot de candidats (id, bio) avec une recherche groupée dans le dictionnaire"""
+        termes = {candidat_id: set(self.scorer.termes(bio)) for candidat_id, bio in candidats}
+        tous_les_termes = sorted(set().union(*termes.values())) if termes else []
+        dictionnaire = {}
+        for lot in _par_lots(tous_les_termes):
+            dictionnaire.update(db.session.execute(
+                select(Competence.nom, Competence.id).where(Competence.nom.in_(lot))
+            ).all())
+
+        for lot in _par_lots(list(termes)):
+            db.session.execute(candidat_competences.delete().where(candidat_competences.c.candidat_id.in_(lot)))
+        liens = [
+            {"candidat_id": candidat_id, "competence_id": dictionnaire[terme]}
+            for candidat_id, termes_candidat in termes.items()
+            for terme in termes_candidat if terme in dictionnaire
+        ]
+        if liens:
+            db.session.execute(candidat_competences.insert(), liens)
+
+    def candidats_correspondants(self, offre_id: int, limit: int = 50, offset: int = 0) -> List[Tuple[Candidat, int]]:
+        """
+        Candidats partageant des compétences avec l'offre
+
+        Intersection des listes de l'index, classée par nombre de compétences communes.
+        """
+        communes = func.count(candidat_competences.c.competence_id).label('communes')
+        correspondances = (
+            select(candidat_competences.c.candidat_id, communes)
+            .join(offre_competences, offre_competences.c.competence_id == candidat_competences.c.competence_id)
+            .where(offre_competences.c.offre_id == offre_id)
+            .group_by(candidat_competences.c.candidat_id)
+            .subquery()
+        )
+        query = (
+            select(Candidat, correspondances.c.communes)
+            .join(correspondances, correspondances.c.candidat_id == Candidat.id)
+            .order_by(correspondances.c.communes.desc(), Candidat.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(candidat, communes) for candidat, communes in db.session.execute(query)]
+
+    def reindexer_tout(self) -> Dict[str, int]:
+        """Reconstruit l'index complet à partir des offres et des candidats existants"""
+        db.session.execute(candidat_competences.delete())
+        db.session.execute(offre_competences.delete())
+
+        # Les compétences des offres d'abord : elles forment le dictionnaire
+        offre_ids = db.session.execute(select(OffreEmploi.id).order_by(OffreEmploi.id)).scalars().all()
+        for lot in _par_lots(offre_ids):
+            for offre in OffreEmploi.query.filter(OffreEmploi.id.in_(lot)):
+                noms = {self.scorer.canonique(c) for c in (offre.competences_cles or []) if c and c.strip()}
+                competences, _ = self._get_or_create(noms)
+                if competences:
+                    db.session.execute(offre_competences.insert(), [
+                        {"offre_id": offre.id, "competence_id": competence_id} for competence_id in competences.values()
+                    ])
+
+        candidat_ids = db.session.execute(select(Candidat.id).order_by(Candidat.id)).scalars().all()
+        for lot in _par_lots(candidat_ids):
+            self.indexer_candidats(db.session.execute(
+                select(Candidat.id, Candidat.bio).where(Candidat.id.in_(lot))
+            ).all())
+            db.session.commit()
+
+        db.session.commit()
+        return {"offres": len(offre_ids), "candidats": len(candidat_ids)}
+
+    def _get_or_create(self, noms: Set[str]) -> Tuple[Dict[str, int], Set[str]]:
+        existantes = {}
+        for lot in _par_lots(sorted(noms)):
+            existantes.update(db.session.execute(
+                select(Competence.nom, Competence.id).where(Competence.nom.in_(lot))
+            ).all())
+
+        nouvelles = noms - set(existantes)
+        for nom in nouvelles:
+            competence = Competence(nom=nom[:100])
+            db.session.add(competence)
+            db.session.flush()
+            existantes[nom] = competence.id
+        return existantes, nouvelles
+
+    def _indexer_candidats_existants(self, competences: Dict[str, int]) -> None:
+        liens = []
+        query = select(Candidat.id, Candidat.bio).execution_options(yield_per=TAILLE_LOT)
+        for candidat_id, bio in db.session.execute(query):
+            termes = set(self.scorer.termes(bio))
+            liens.extend(
+                {"candidat_id": candidat_id, "competence_id": competence_id}
+                for nom, competence_id in competences.items() if nom in termes
+            )
+        if liens:
+            db.session.execute(candidat_competences.insert(), liens)
+
+def _par_lots(valeurs: List, taille: int = TAILLE_LOT) -> Iterable[List]:
+    for i in range(0, len(valeurs), taille):
+        yield valeurs[i:i + taille]
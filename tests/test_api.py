@@ -1,8 +1,57 @@
 import unittest
+import gzip
 import json
+import re
+import tempfile
+from contextlib import contextmanager
+from unittest.mock import patch
+from sqlalchemy import event
 from app import create_app
 from config import TestingConfig
-from models.models import db
+from models.models import db, ScoreCompatibilite
+from services.services import AIService
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """Faux modèle Gemini renvoyant toujours le même texte"""
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+    
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.text)
+
+class FakeBatchModel:
+    """Faux modèle Gemini : score = 10 x identifiant du candidat"""
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        ids = [int(i) for i in re.findall(r'candidat_id (\d+):', prompt)]
+        return FakeResponse(json.dumps([
+            {"candidat_id": i, "score": 10 * i, "justification": f"Candidat {i}"} for i in ids
+        ]))
+
+@contextmanager
+def count_queries(app):
+    """Compte les requêtes SQL exécutées dans le bloc"""
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
 
 class SmartRecruitAPITestCase(unittest.TestCase):
     """Tests pour l'API Smart-Recruit"""
@@ -17,6 +66,8 @@ class SmartRecruitAPITestCase(unittest.TestCase):
     
     def tearDown(self):
         """Nettoyage après chaque test"""
+        self.app.extensions['jobs'].shutdown()
+        self.app.extensions['match_scores'].shutdown()
         with self.app.app_context():
             db.session.remove()
             db.drop_all()
@@ -135,6 +186,401 @@ class SmartRecruitAPITestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.get_json()), 0)
     
+    def _create_candidate(self, email="paul.durand@email.com", bio="Développeur Python et Flask, 4 ans d'expérience"):
+        data = {"nom": "Paul Durand", "email": email, "bio": bio, "diplome": "Master"}
+        response = self.client.post('/api/candidates', data=json.dumps(data), content_type='application/json')
+        return response.get_json()['id']
+    
+    def _create_offer(self, competences=None):
+        data = {
+            "titre": "Développeur Backend",
+            "description": "Développement d'API REST en Python",
+            "competences_cles": competences or ["Python", "Flask"],
+            "salaire": 45000
+        }
+        response = self.client.post('/api/offers', data=json.dumps(data), content_type='application/json')
+        return response.get_json()['id']
+    
+    def test_analyze_match_uses_score_cache(self):
+        """Test du cache de scores : un second appel ne sollicite pas l'IA"""
+        candidat_id = self._create_candidate()
+        offre_id = self._create_offer()
+        
+        with patch.object(AIService, '__init__', return_value=None), \
+             patch.object(AIService, 'analyze_compatibility',
+                          return_value={"score": 80, "justification": "Bon profil"}) as analyze:
+            for _ in range(2):
+                response = self.client.post(f'/api/offers/{offre_id}/analyze-match',
+                                            data=json.dumps({"candidat_id": candidat_id}),
+                                            content_type='application/json')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get_json()['score'], 80)
+            self.assertEqual(analyze.call_count, 1)
+            
+            # Le cache persistant survit à la perte du cache mémoire
+            self.app.extensions['score_cache'].clear()
+            self.client.post(f'/api/offers/{offre_id}/analyze-match',
+                             data=json.dumps({"candidat_id": candidat_id}),
+                             content_type='application/json')
+            self.assertEqual(analyze.call_count, 1)
+            
+            with self.app.app_context():
+                self.assertEqual(ScoreCompatibilite.query.count(), 1)
+    
+    def test_rank_candidates(self):
+        """Test du classement groupé des candidats d'une offre"""
+        offre_id = self._create_offer()
+        for i in range(3):
+            candidat_id = self._create_candidate(email=f"candidat{i}@email.com")
+            self.client.post('/api/apply',
+                             data=json.dumps({"candidat_id": candidat_id, "offre_id": offre_id}),
+                             content_type='application/json')
+        
+        # Candidat sans aucune compétence commune : écarté par le pré-filtrage local
+        comptable_id = self._create_candidate(email="comptable@email.com", bio="Comptable, gestion de la paie")
+        self.client.post('/api/apply',
+                         data=json.dumps({"candidat_id": comptable_id, "offre_id": offre_id}),
+                         content_type='application/json')
+        
+        fake_model = FakeBatchModel()
+        def fake_init(service):
+            service.model = fake_model
+        
+        with patch.object(AIService, '__init__', fake_init):
+            response = self.client.post(f'/api/offers/{offre_id}/rank')
+            self.assertEqual(response.status_code, 200)
+            ranking = response.get_json()
+            self.assertEqual([c['score'] for c in ranking[:3]], [30, 20, 10])
+            self.assertEqual(ranking[3]['candidat_id'], comptable_id)
+            self.assertEqual(ranking[3]['methode'], 'local')
+            self.assertEqual(fake_model.calls, 1)
+            
+            # Les scores sont ensuite servis par le cache
+            self.client.post(f'/api/offers/{offre_id}/rank')
+            self.assertEqual(fake_model.calls, 1)
+    
+    def test_analysis_job(self):
+        """Test d'une analyse soumise en arrière-plan puis consultée par long-poll"""
+        candidat_id = self._create_candidate()
+        offre_id = self._create_offer()
+        
+        with patch.object(AIService, '__init__', return_value=None), \
+             patch.object(AIService, 'analyze_compatibility',
+                          return_value={"score": 65, "justification": "Profil partiel"}):
+            response = self.client.post('/api/jobs',
+                                        data=json.dumps({"offre_id": offre_id, "candidat_id": candidat_id}),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 202)
+            job_id = response.get_json()['id']
+            
+            response = self.client.get(f'/api/jobs/{job_id}?wait=5')
+            self.assertEqual(response.status_code, 200)
+            job = response.get_json()
+            self.assertEqual(job['statut'], 'terminee')
+            self.assertEqual(job['resultat']['score'], 65)
+        
+        response = self.client.get('/api/jobs/9999')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_ai_client_registry_reuses_clients(self):
+        """Test du registre : un seul client Gemini construit par modèle"""
+        self.app.config['GEMINI_API_KEY'] = 'cle-de-test'
+        with self.app.app_context(), \
+             patch('services.services.genai.configure') as configure, \
+             patch('services.services.genai.GenerativeModel') as model_class:
+            first = AIService()
+            second = AIService()
+            self.assertIs(first.model, second.model)
+            self.assertEqual(configure.call_count, 1)
+            self.assertEqual(model_class.call_count, 1)
+        
+        stats = self.client.get('/health').get_json()['ai_clients']
+        self.assertEqual(stats, {"clients_crees": 1, "clients_reutilises": 1})
+    
+    def test_matching_candidates(self):
+        """Test de l'index inversé des compétences"""
+        # Candidat créé avant l'offre : indexé lors de la création de l'offre
+        python_flask = self._create_candidate(email="a@email.com", bio="Développeur Python et Flask")
+        offre_id = self._create_offer(competences=["Python", "Flask", "PostgreSQL"])
+        # Candidat créé après l'offre : indexé à sa création (synonyme postgres)
+        complet = self._create_candidate(email="b@email.com", bio="Python, Flask et Postgres au quotidien")
+        self._create_candidate(email="c@email.com", bio="Comptable, gestion de la paie")
+        
+        response = self.client.get(f'/api/offers/{offre_id}/matching-candidates')
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertEqual([c['id'] for c in result], [complet, python_flask])
+        self.assertEqual([c['competences_communes'] for c in result], [3, 2])
+    
+    def test_list_pagination_fields_and_filters(self):
+        """Test de la pagination par curseur, de la projection et des filtres"""
+        for i in range(5):
+            data = {"nom": f"Candidat {i}", "email": f"c{i}@email.com",
+                    "bio": "Profil de test suffisamment long", "diplome": "Master" if i % 2 else "Licence"}
+            self.client.post('/api/candidates', data=json.dumps(data), content_type='application/json')
+        
+        response = self.client.get('/api/candidates?limit=2')
+        self.assertEqual(len(response.get_json()), 2)
+        cursor = response.headers['X-Next-Cursor']
+        
+        ids = [c['id'] for c in response.get_json()]
+        while cursor:
+            response = self.client.get(f'/api/candidates?limit=2&cursor={cursor}')
+            ids += [c['id'] for c in response.get_json()]
+            cursor = response.headers.get('X-Next-Cursor')
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 5)
+        
+        response = self.client.get('/api/candidates?fields=id,nom&diplome=Master')
+        self.assertEqual([set(c) for c in response.get_json()], [{"id", "nom"}] * 2)
+        
+        self.assertEqual(self.client.get('/api/candidates?fields=motdepasse').status_code, 400)
+        self.assertEqual(self.client.get('/api/offers?salaire_min=abc').status_code, 400)
+        self.assertEqual(len(self.client.get('/api/candidates?date_min=2999-01-01').get_json()), 0)
+        
+        self._create_offer()
+        self.assertEqual(len(self.client.get('/api/offers?salaire_min=40000&salaire_max=50000').get_json()), 1)
+        self.assertEqual(len(self.client.get('/api/offers?salaire_min=50001').get_json()), 0)
+    
+    def _count_queries_for(self, url):
+        with count_queries(self.app) as statements:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+    
+    def test_query_count_does_not_scale_with_results(self):
+        """Garde-fou N+1 : le nombre de requêtes ne dépend pas du nombre de résultats"""
+        offre_id = self._create_offer()
+        urls = ['/api/applications', f'/api/offers/{offre_id}/candidates']
+        
+        def apply(i):
+            candidat_id = self._create_candidate(email=f"n{i}@email.com")
+            self.client.post('/api/apply',
+                             data=json.dumps({"candidat_id": candidat_id, "offre_id": offre_id}),
+                             content_type='application/json')
+        
+        apply(0)
+        baseline = {url: self._count_queries_for(url) for url in urls}
+        for i in range(1, 6):
+            apply(i)
+        for url in urls:
+            self.assertEqual(self._count_queries_for(url), baseline[url], url)
+        self.assertEqual(baseline['/api/applications'], 1)
+    
+    def test_streaming_export(self):
+        """Test de l'export en flux (NDJSON, tableau JSON, gzip)"""
+        offre_id = self._create_offer()
+        for i in range(3):
+            candidat_id = self._create_candidate(email=f"export{i}@email.com")
+            self.client.post('/api/apply',
+                             data=json.dumps({"candidat_id": candidat_id, "offre_id": offre_id}),
+                             content_type='application/json')
+        
+        response = self.client.get('/api/candidates/export')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([c['email'] for c in lines], [f"export{i}@email.com" for i in range(3)])
+        
+        response = self.client.get('/api/applications/export?format=json&gzip=1')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        applications = json.loads(gzip.decompress(response.get_data()))
+        self.assertEqual(len(applications), 3)
+        self.assertEqual(applications[0]['offre']['id'], offre_id)
+        
+        self.assertEqual(self.client.get('/api/candidates/export?format=xml').status_code, 400)
+    
+    def test_bulk_import(self):
+        """Test de l'import en masse avec rapport d'erreurs par ligne"""
+        existing = self._create_candidate(email="deja@email.com")
+        candidats = [
+            {"nom": "Ana", "email": "ana@email.com", "bio": "Développeuse Python senior", "diplome": "Master"},
+            {"nom": "Bob", "email": "deja@email.com", "bio": "Profil déjà inscrit", "diplome": "Licence"},
+            {"nom": "Eve", "email": "pas-un-email", "bio": "Email invalide ici", "diplome": "Licence"},
+            {"nom": "Ana bis", "email": "ana@email.com", "bio": "Doublon dans le même lot", "diplome": "Master"},
+        ]
+        ndjson = "\n".join(json.dumps(c) for c in candidats)
+        response = self.client.post('/api/candidates/bulk', data=ndjson, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        rapport = response.get_json()
+        self.assertEqual((rapport['crees'], rapport['rejetes']), (1, 3))
+        self.assertEqual([e['index'] for e in rapport['erreurs']], [2, 1, 3])
+        ana = rapport['ids'][0]['id']
+        
+        response = self.client.post('/api/offers/bulk', data=json.dumps([
+            {"titre": "Backend", "description": "API REST en Python", "competences_cles": ["Python"], "salaire": 50000},
+            {"titre": "Sans compétences", "description": "Description valide", "competences_cles": []},
+        ]), content_type='application/json')
+        rapport = response.get_json()
+        self.assertEqual((rapport['crees'], rapport['rejetes']), (1, 1))
+        offre = rapport['ids'][0]['id']
+        
+        response = self.client.post('/api/applications/bulk', data=json.dumps([
+            {"candidat_id": ana, "offre_id": offre},
+            {"candidat_id": existing, "offre_id": offre},
+            {"candidat_id": ana, "offre_id": offre},
+            {"candidat_id": 9999, "offre_id": offre},
+        ]), content_type='application/json')
+        rapport = response.get_json()
+        self.assertEqual((rapport['crees'], rapport['rejetes']), (2, 2))
+        
+        # L'index des compétences est maintenu par l'import
+        matching = self.client.get(f'/api/offers/{offre}/matching-candidates').get_json()
+        self.assertIn(ana, [c['id'] for c in matching])
+        
+        self.assertEqual(self.client.post('/api/candidates/bulk', data=json.dumps({"nom": "x"}),
+                                          content_type='application/json').status_code, 400)
+    
+    def test_pool_metrics(self):
+        """Test des métriques du pool de connexions"""
+        self.client.get('/api/candidates')
+        response = self.client.get('/health/db')
+        self.assertEqual(response.status_code, 200)
+        metrics = response.get_json()
+        self.assertEqual(metrics['pool'], 'InstrumentedQueuePool')
+        self.assertGreater(metrics['checkouts'], 0)
+        self.assertIn('debordement', metrics)
+    
+    def test_metrics_endpoint(self):
+        """Test de l'exposition des métriques (HTTP, SQL, IA, cache)"""
+        candidat_id = self._create_candidate()
+        offre_id = self._create_offer()
+        fake_model = FakeModel('{"score": 70, "justification": "Bon profil"}')
+        
+        def fake_init(service):
+            service.model = fake_model
+        
+        with patch.object(AIService, '__init__', fake_init):
+            for _ in range(2):
+                self.client.post(f'/api/offers/{offre_id}/analyze-match',
+                                 data=json.dumps({"candidat_id": candidat_id}),
+                                 content_type='application/json')
+        
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('smartrecruit_http_request_duration_seconds_count{blueprint="offers",'
+                      'route="/api/offers/<int:offer_id>/analyze-match",method="POST",status="200"} 2', body)
+        self.assertIn('smartrecruit_sql_query_duration_seconds_count{operation="INSERT"}', body)
+        self.assertIn('smartrecruit_ai_call_duration_seconds_count{operation="analyse",outcome="ok"} 1', body)
+        self.assertIn('smartrecruit_score_cache_total{resultat="hits_memoire"} 1', body)
+    
+    def test_request_profiling(self):
+        """Test du profilage activé par jeton signé"""
+        # Désactivé par défaut : pas d'index de rapports
+        self.assertEqual(self.client.get('/profiling/').status_code, 404)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            class ProfilingConfig(TestingConfig):
+                PROFILING_MODE = 'header'
+                PROFILING_DIR = directory
+            
+            app = create_app(ProfilingConfig)
+            client = app.test_client()
+            self.client.post('/api/candidates', data=json.dumps({
+                "nom": "Profil", "email": "profil@email.com", "bio": "Bio de test assez longue", "diplome": "Master"
+            }), content_type='application/json')
+            
+            # Sans jeton valide, aucune trace
+            response = client.get('/api/candidates', headers={'X-Profile-Token': 'faux'})
+            self.assertNotIn('X-Profile-Report', response.headers)
+            
+            token = app.extensions['profiling'].creer_jeton()
+            response = client.get('/api/candidates', headers={'X-Profile-Token': token})
+            name = response.headers['X-Profile-Report']
+            
+            report = client.get(f'/profiling/{name}').get_json()
+            self.assertEqual(report['route'], '/api/candidates')
+            self.assertGreaterEqual(report['sql_requetes'], 1)
+            self.assertGreater(report['marshmallow_ms'], 0)
+            self.assertEqual([r['nom'] for r in client.get('/profiling/').get_json()], [name])
+            self.assertEqual(client.get(f'/profiling/{name}.collapsed').status_code, 200)
+            self.assertEqual(client.get('/profiling/inexistant').status_code, 404)
+    
+    def test_match_scores_precomputed(self):
+        """Test de la matrice des scores rafraîchie à la création et lue par top-N"""
+        python_id = self._create_candidate("python@email.com", "Développeur Python et Flask, API REST")
+        offre_id = self._create_offer(["Python", "Flask"])
+        comptable_id = self._create_candidate("compta@email.com", "Comptable, bilans et fiscalité")
+        self.app.extensions['match_scores'].attendre(timeout=10)
+        
+        top = self.client.get(f'/api/offers/{offre_id}/top-candidates').get_json()
+        self.assertEqual([c['id'] for c in top], [python_id, comptable_id])
+        self.assertGreater(top[0]['score'], top[1]['score'])
+        self.assertEqual({c['methode'] for c in top}, {'local'})
+        self.assertEqual(len(self.client.get(f'/api/offers/{offre_id}/top-candidates?limit=1').get_json()), 1)
+        
+        # Un score IA remplace le score local de la paire, sans être écrasé par un rafraîchissement
+        with patch.object(AIService, 'analyze_compatibility',
+                          return_value={"score": 99, "justification": "Excellent", "statut": "score"}):
+            self.client.post(f'/api/offers/{offre_id}/analyze-match', json={"candidat_id": comptable_id})
+        self.app.extensions['match_scores'].rafraichir_offres([offre_id])
+        self.app.extensions['match_scores'].attendre(timeout=10)
+        
+        top = self.client.get(f'/api/offers/{offre_id}/top-candidates').get_json()
+        self.assertEqual((top[0]['id'], top[0]['score'], top[0]['methode']), (comptable_id, 99, 'ia'))
+        self.assertEqual(self.client.get('/api/offers/999/top-candidates').status_code, 404)
+    
+    def test_ai_resilience(self):
+        """Test des réessais, du disjoncteur et du statut dégradé des analyses IA"""
+        from google.api_core import exceptions as google_exceptions
+        from services.resilience_service import ResilientCaller
+        from services.services import ERREURS_REESSAYABLES
+        
+        class FailingModel:
+            calls = 0
+            def generate_content(self, prompt, **kwargs):
+                FailingModel.calls += 1
+                self.timeout = kwargs['request_options']['timeout']
+                raise google_exceptions.ServiceUnavailable("Surcharge")
+        
+        self.app.extensions['ai_registry'].caller = ResilientCaller(
+            timeout=5, max_retries=1, backoff_base=0, seuil_circuit=2, reessayables=ERREURS_REESSAYABLES)
+        candidat_id = self._create_candidate("resilience@email.com", "Développeur Python")
+        offre_id = self._create_offer(["Python"])
+        
+        def fake_init(service):
+            service.model = FailingModel()
+        
+        with patch.object(AIService, '__init__', fake_init):
+            response = self.client.post(f'/api/offers/{offre_id}/analyze-match', json={"candidat_id": candidat_id})
+            result = response.get_json()
+            self.assertEqual(result['statut'], 'degrade')
+            self.assertIsNone(result['score'])
+            # Une tentative + un réessai, puis le circuit s'ouvre : l'appel suivant échoue sans tentative
+            self.assertEqual(FailingModel.calls, 2)
+            response = self.client.post(f'/api/offers/{offre_id}/analyze-match', json={"candidat_id": candidat_id})
+            self.assertEqual(response.get_json()['statut'], 'degrade')
+            self.assertEqual(FailingModel.calls, 2)
+        
+        # Les résultats dégradés ne sont jamais mis en cache
+        with self.app.app_context():
+            self.assertEqual(ScoreCompatibilite.query.count(), 0)
+        health = self.client.get('/health').get_json()['ai_resilience']
+        self.assertEqual(health['circuit'], 'ouvert')
+        self.assertEqual(health['refus_circuit'], 1)
+    
+    def test_benchmark_suite(self):
+        """Test des briques de la suite de benchmarks (données, Gemini simulé, comparaison)"""
+        from benchmarks.fake_gemini import fake_gemini
+        from benchmarks.seed import seed
+        from benchmarks.suite import comparer
+        
+        self.app.config['GEMINI_API_KEY'] = 'benchmark'
+        with self.app.app_context():
+            volumes = seed(20, 3, 30)
+        self.assertEqual(volumes['candidatures'], 30)
+        self.assertEqual(len(self.client.get('/api/applications').get_json()), 30)
+        
+        with fake_gemini() as model:
+            response = self.client.post('/api/offers/1/analyze-match', json={"candidat_id": 2})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(model.calls, 1)
+        
+        reference = {"resultats": {"client": {"liste": {"p95_ms": 10.0, "req_s": 100.0}}}}
+        self.assertEqual(comparer(reference, reference, 0.2), [])
+        lent = {"resultats": {"client": {"liste": {"p95_ms": 15.0, "req_s": 70.0}}}}
+        self.assertEqual(len(comparer(lent, reference, 0.2)), 2)
+    
     def test_health_check(self):
         """Test de l'endpoint de santé"""
         response = self.client.get('/health')
@@ -0,0 +1,37 @@
+import unittest
+from types import SimpleNamespace
+from services.scoring_service import LocalScorer
+
+class LocalScorerTestCase(unittest.TestCase):
+    """Tests du moteur de score local"""
+    
+    def setUp(self):
+        self.scorer = LocalScorer()
+        self.offre = SimpleNamespace(
+            description="Développement d'API REST et de pipelines de données",
+            competences_cles=["Python", "PostgreSQL", "Machine Learning"]
+        )
+    
+    def test_normalisation_et_synonymes(self):
+        """Accents, casse et synonymes ramenés à une forme canonique"""
+        self.assertEqual(self.scorer.normaliser("Développeur SÉNIOR, Node.js !"), "developpeur senior node.js")
+        self.assertEqual(self.scorer.canonique("Postgres"), self.scorer.canonique("PostgreSQL"))
+        self.assertIn("machine learning", self.scorer.termes("Expert en ML"))
+    
+    def test_prefiltrage(self):
+        """Seules les correspondances au-dessus du seuil sont retenues, dans la limite de top_k"""
+        candidats = [
+            SimpleNamespace(id=1, bio="Développeur python, bases postgres, un peu de ML"),
+            SimpleNamespace(id=2, bio="Comptable confirmé, maîtrise de la paie"),
+            SimpleNamespace(id=3, bio="Ingénieur Python"),
+        ]
+        retenus, scores = self.scorer.prefiltrer(self.offre, candidats, seuil=20, top_k=5)
+        self.assertEqual([c.id for c in retenus], [1, 3])
+        self.assertEqual(scores[2]['competences'], [])
+        self.assertGreater(scores[1]['score'], scores[3]['score'])
+        
+        retenus, _ = self.scorer.prefiltrer(self.offre, candidats, seuil=20, top_k=1)
+        self.assertEqual([c.id for c in retenus], [1])
+
+if __name__ == '__main__':
+    unittest.main()